@@ -0,0 +1,164 @@
+"""Password hashing and signed session tokens.
+
+Passwords are stored as `scrypt$n$r$p$salt$hash`. Rows written before
+hashing (plaintext) or with older cost parameters still verify, and are
+flagged so the caller can rehash them on the next successful login.
+
+scrypt is slow and memory-hard on purpose, so `PasswordHasher` runs it in a
+small thread pool (hashlib releases the GIL while hashing) and turns work
+away with `Busy` once its queue is full. A login storm then costs a bounded
+number of cores instead of stalling every other request.
+
+Tokens are `payload.signature`: base64url JSON `{"sub": user_id, "exp": unix
+time}` signed with HMAC-SHA256. `TokenSigner.verify` remembers tokens it has
+already checked in an LRU, so most authenticated requests cost a dict lookup
+and an expiry check.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 15, 8, 1  # ~32 MB and ~0.1 s per hash
+PREFIX = "scrypt$"
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+# ── Passwords ──
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # maxmem must cover scrypt's 128*r*n working set; OpenSSL's default is 32 MB
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * r * n, dklen=32)
+
+
+def hash_password(password: str, n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P) -> str:
+    salt = os.urandom(16)
+    return f"{PREFIX}{n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+
+def verify_password(password: str, stored: str, params: Tuple[int, int, int] = (SCRYPT_N, SCRYPT_R, SCRYPT_P)) -> Tuple[bool, bool]:
+    """(matches, needs_rehash) for a stored hash, or a legacy plaintext password."""
+    if not stored.startswith(PREFIX):
+        return hmac.compare_digest(password.encode(), stored.encode()), True
+    n, r, p, salt, digest = stored[len(PREFIX):].split("$")
+    n, r, p = int(n), int(r), int(p)
+    ok = hmac.compare_digest(_scrypt(password, _unb64(salt), n, r, p), _unb64(digest))
+    return ok, (n, r, p) != tuple(params)
+
+
+class Busy(Exception):
+    """The hashing queue is full; the client should retry later."""
+
+
+class PasswordHasher:
+    """Runs hash/verify on `workers` threads with at most `queue` more waiting."""
+
+    def __init__(self, workers: int = 1, queue: int = 32,
+                 n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P):
+        self.workers, self.queue = workers, queue
+        self.params = (n, r, p)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._decoy: Optional[str] = None
+        self.pending = self.done = self.rejected = 0
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.workers + self.queue:
+                self.rejected += 1
+                raise Busy("password hashing queue is full")
+            self.pending += 1
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="applyai-scrypt")
+        fut = self._pool.submit(fn, *args)
+        fut.add_done_callback(self._finished)  # counts the thread's work even if the caller goes away
+        return await asyncio.wrap_future(fut)
+
+    def _finished(self, _):
+        with self._lock:
+            self.pending -= 1
+            self.done += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, *self.params)
+
+    async def verify(self, password: str, stored: Optional[str]) -> Tuple[bool, bool]:
+        """(matches, needs_rehash); `stored=None` (unknown user) costs the same as a real check."""
+        if stored is None:
+            await self._run(self._check_decoy, password)
+            return False, False
+        return await self._run(verify_password, password, stored, self.params)
+
+    def _check_decoy(self, password: str):
+        if self._decoy is None:
+            self._decoy = hash_password("", *self.params)
+        verify_password(password, self._decoy, self.params)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def as_dict(self) -> dict:
+        return {"workers": self.workers, "queue": self.queue, "pending": self.pending,
+                "done": self.done, "rejected": self.rejected}
+
+
+# ── Tokens ──
+class TokenSigner:
+    def __init__(self, secret: bytes, ttl: float = 7 * 86400, cache_size: int = 10_000):
+        self.secret, self.ttl, self.cache_size = secret, ttl, cache_size
+        self._cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def _sign(self, payload: str) -> bytes:
+        return hmac.new(self.secret, payload.encode(), hashlib.sha256).digest()
+
+    def issue(self, user_id: str) -> str:
+        claims = {"sub": user_id, "exp": int(time.time() + self.ttl)}
+        payload = _b64(json.dumps(claims, separators=(",", ":")).encode())
+        return payload + "." + _b64(self._sign(payload))
+
+    def verify(self, token: str) -> Optional[str]:
+        """The token's user id, or None if it is malformed, forged or expired."""
+        now = time.time()
+        with self._lock:
+            hit = self._cache.get(token)
+            if hit is not None:
+                self.hits += 1
+                if hit[1] <= now:
+                    del self._cache[token]
+                    return None
+                self._cache.move_to_end(token)
+                return hit[0]
+            self.misses += 1
+        payload, _, sig = token.partition(".")
+        try:
+            if not hmac.compare_digest(_unb64(sig), self._sign(payload)):
+                return None
+            claims = json.loads(_unb64(payload))
+            user_id, exp = str(claims["sub"]), float(claims["exp"])
+        except (ValueError, KeyError, TypeError):
+            return None
+        if exp <= now:
+            return None
+        # only valid tokens are cached, so junk tokens can't flush real ones out
+        with self._lock:
+            self._cache[token] = (user_id, exp)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return user_id
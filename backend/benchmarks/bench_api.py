@@ -0,0 +1,251 @@
+"""Reproducible API benchmark over synthetic catalogs.
+
+For each --catalog size a fresh child process:
+
+* scales the `build_jobs` seed to that many jobs (seeded, so runs match)
+* creates --users synthetic users with saved profiles, --history
+  applications each
+* drives the API in-process through httpx's ASGI transport, with
+  --concurrency requests in flight
+
+Scenarios:
+
+    jobs          GET  /api/jobs with a mix of text, skill, location, portal,
+                       salary / experience ranges, per-user ranking, paging
+    apply         POST /api/apply with 1-5 ids for fresh users
+    applications  GET  /api/applications for users with long histories, walking pages
+    stats         GET  /api/stats
+    cover_letter  POST /api/cover-letter across tones, with repeats
+
+Prints a table and writes one JSON document (--out, default stdout).
+The JSON holds throughput, p50/p95/p99 latency and error counts per
+scenario, plus catalog build time and peak RSS per catalog, tagged with the
+git commit so runs can be compared across commits.
+
+    cd backend && python benchmarks/bench_api.py --catalog 1000,100000 --requests 2000 --out bench.json
+    cd backend && python benchmarks/bench_api.py --catalog 1000000 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import percentile_ms, scaled_catalog
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+SCENARIOS = ("jobs", "apply", "applications", "stats", "cover_letter")
+
+
+def peak_rss_mb() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # KiB on Linux
+
+
+# ── Synthetic data ──
+def synthetic_catalog(main, n: int, seed: int) -> list:
+    """The demo seed scaled to `n` jobs; copies get new ids, locations and match scores."""
+    random.seed(seed)  # build_jobs picks "posted" labels at random
+    return scaled_catalog(main.build_jobs(), n, random.Random(seed))
+
+
+def make_profile(rng: random.Random, user_id: str, skills: list, titles: list) -> dict:
+    return {"user_id": user_id, "name": f"Bench {user_id}", "email": f"{user_id}@bench.test",
+            "phone": "+91 9876543210", "location": rng.choice(["Bangalore", "Pune", "Remote"]),
+            "experience": f"{rng.randint(1, 10)} years", "skills": rng.sample(skills, 4),
+            "job_titles": rng.sample(titles, 2), "salary_min": rng.choice([0, 800000, 1500000]),
+            "salary_max": 3000000, "job_type": "Full-time", "preferred_locations": ["Remote"]}
+
+
+# ── Request mixes ──
+def jobs_request(rng, ctx):
+    params = {"limit": rng.choice([20, 50, 200]), "fields": rng.choice(["", "id,title,company,match"])}
+    for key, values in (("q", ctx["words"]), ("skills", ctx["skills"]), ("location", ctx["locations"]),
+                        ("portal", ctx["portals"])):
+        if rng.random() < 0.35:
+            params[key] = rng.choice(values)
+    if rng.random() < 0.2:
+        params["min_match"] = rng.choice([60, 75, 90])
+    if rng.random() < 0.2:
+        params["salary_min"] = rng.choice([10, 20, 30])
+    if rng.random() < 0.2:
+        params["exp_max"] = rng.choice([3, 5, 8])
+    if rng.random() < 0.3:
+        params["user_id"] = rng.choice(ctx["users"])
+    if rng.random() < 0.1 and "user_id" not in params:  # per-user ranking pages with its own keys
+        params["cursor"] = ctx["cursor"]
+    return "GET", "/api/jobs", {"params": {k: v for k, v in params.items() if v != ""}}
+
+
+def apply_request(rng, ctx):
+    ctx["fresh"] += 1
+    ids = [f"j{rng.randint(1, ctx['n'])}" for _ in range(rng.randint(1, 5))]
+    return "POST", "/api/apply", {"json": {"user_id": f"fresh-{ctx['fresh']}", "job_ids": ids}}
+
+
+def applications_request(rng, ctx):
+    user = rng.choice(ctx["users"])
+    params = {"limit": rng.choice([50, 200])}
+    cursor = ctx["app_cursors"].get(user)
+    if cursor and rng.random() < 0.5:
+        params["cursor"] = cursor
+    return "GET", f"/api/applications/{user}", {"params": params}
+
+
+def stats_request(rng, ctx):
+    return "GET", f"/api/stats/{rng.choice(ctx['users'])}", {}
+
+
+def cover_letter_request(rng, ctx):
+    # A small pool of combinations so the letter cache sees realistic repeats
+    j = ctx["seed_jobs"][rng.randrange(min(len(ctx["seed_jobs"]), 30))]
+    return "POST", "/api/cover-letter", {"json": {
+        "job_title": j["title"], "company": j["company"], "skills": j["skills"],
+        "experience": rng.choice(["2 years", "5 years"]), "name": rng.choice(["Asha", "Ravi", "Meera"]),
+        "tone": rng.choice(["professional", "enthusiastic", "concise"])}}
+
+
+MIXES = {"jobs": jobs_request, "apply": apply_request, "applications": applications_request,
+         "stats": stats_request, "cover_letter": cover_letter_request}
+
+
+async def drive(client, name: str, rng: random.Random, ctx: dict, requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    sem = asyncio.Semaphore(concurrency)
+    make = MIXES[name]
+
+    async def one():
+        nonlocal errors
+        method, url, kw = make(rng, ctx)
+        async with sem:
+            start = time.perf_counter()
+            r = await client.request(method, url, **kw)
+            latencies.append(time.perf_counter() - start)
+        if r.status_code >= 400:
+            errors += 1
+        elif name == "applications" and r.json().get("next_cursor"):
+            ctx["app_cursors"][url.rsplit("/", 1)[1]] = r.json()["next_cursor"]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    wall = time.perf_counter() - start
+    return {"requests": requests, "errors": errors,
+            "throughput_rps": round(requests / wall, 1),
+            **{f"p{p}_ms": percentile_ms(latencies, p, 3) for p in (50, 95, 99)},
+            "peak_rss_mb": peak_rss_mb()}
+
+
+# ── One catalog size (child process) ──
+def run_catalog(args) -> dict:
+    sys.path.insert(0, BACKEND_DIR)
+    import httpx
+    import main
+
+    main.startup()
+    t = time.perf_counter()
+    seed_jobs = synthetic_catalog(main, args.run_catalog, args.seed)
+    main.load_catalog(seed_jobs)
+    build_s = time.perf_counter() - t
+
+    rng = random.Random(args.seed)
+    skills = sorted({s for j in seed_jobs[:50] for s in j["skills"]})
+    titles = sorted({j["title"] for j in seed_jobs[:50]})
+    users = [f"bench-user-{i}" for i in range(args.users)]
+    t = time.perf_counter()
+    history = min(args.history, args.run_catalog)
+    for uid in users:
+        main.REPO.save_profile(uid, make_profile(rng, uid, skills, titles))
+        ids = rng.sample(range(1, args.run_catalog + 1), history)
+        for i in range(0, history, 5000):
+            main._apply_to_jobs(uid, [f"j{k}" for k in ids[i:i + 5000]])
+    seed_s = time.perf_counter() - t
+
+    base = seed_jobs[:50]
+    del seed_jobs  # the records are indexed; drop the dicts so they don't count towards RSS
+    ctx = {"n": args.run_catalog, "users": users, "skills": skills, "titles": titles,
+           "portals": sorted({j["portal"] for j in base}), "locations": sorted({j["location"] for j in base}),
+           "words": sorted({w for title in titles for w in title.lower().split()}),
+           "seed_jobs": base, "fresh": 0, "app_cursors": {}}
+
+    async def all_scenarios():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            first = (await client.get("/api/jobs", params={"limit": 50})).json()
+            ctx["cursor"] = first["next_cursor"] or ""
+            results = {}
+            for name in args.scenarios.split(","):
+                srng = random.Random(f"{args.seed}-{name}")
+                if args.warmup:
+                    await drive(client, name, srng, ctx, args.warmup, args.concurrency)
+                results[name] = await drive(client, name, srng, ctx, args.requests, args.concurrency)
+            return results
+
+    scenarios = asyncio.run(all_scenarios())
+    return {"catalog": args.run_catalog, "build_s": round(build_s, 2), "seed_users_s": round(seed_s, 2),
+            "users": args.users, "history_per_user": history, "peak_rss_mb": peak_rss_mb(),
+            "scenarios": scenarios}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--catalog", default="1000,100000", help="comma-separated catalog sizes")
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--requests", type=int, default=1000, help="measured requests per scenario")
+    ap.add_argument("--warmup", type=int, default=50)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--users", type=int, default=20)
+    ap.add_argument("--history", type=int, default=5000, help="applications per synthetic user")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", default="")
+    ap.add_argument("--run-catalog", type=int, default=0, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.run_catalog:
+        print(json.dumps(run_catalog(args)))
+        return
+
+    report = {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+              "config": {k: getattr(args, k) for k in ("scenarios", "requests", "warmup", "concurrency",
+                                                       "users", "history", "seed")},
+              "catalogs": []}
+    for size in [int(s) for s in args.catalog.split(",")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {**os.environ, "APPLYAI_DB": os.path.join(tmp, "bench.db"), "CATALOG_SNAPSHOT": "",
+                   "STATUS_SCHEDULER": "0", "PROFILE_SLOW_MS": "0"}
+            child = [f"--{k}={v}" for k, v in report["config"].items()] + [f"--run-catalog={size}"]
+            out = subprocess.run([sys.executable, __file__, *child],
+                                 env=env, capture_output=True, text=True)
+        if out.returncode != 0:
+            sys.stderr.write(out.stderr)
+            sys.exit(out.returncode)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        report["catalogs"].append(result)
+        print(f"── catalog={size:,} build={result['build_s']}s peak_rss={result['peak_rss_mb']} MB", file=sys.stderr)
+        for name, s in result["scenarios"].items():
+            print(f"  {name:<13} {s['throughput_rps']:>9} req/s  p50={s['p50_ms']:>8} ms  "
+                  f"p95={s['p95_ms']:>8} ms  p99={s['p99_ms']:>8} ms  errors={s['errors']}", file=sys.stderr)
+
+    doc = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(doc + "\n")
+    else:
+        print(doc)
+
+
+if __name__ == "__main__":
+    main_()
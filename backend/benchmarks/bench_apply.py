@@ -0,0 +1,68 @@
+"""Bulk-apply throughput benchmark.
+
+Scales the demo catalog to --catalog jobs, then applies one user to --ids of
+them through POST /api/apply/bulk in a single call and reports ids/second.
+`--legacy` also times the old per-id linear scan on the same input.
+
+    cd backend && python benchmarks/bench_apply.py --catalog 100000 --ids 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPLYAI_DB", ":memory:")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from common import scaled_catalog  # noqa: E402
+
+
+def legacy_apply(job_ids: list) -> int:
+    found = 0
+    for job_id in job_ids:
+        if next((j for j in main.JOB_INDEX.jobs if j.id == job_id), None):
+            found += 1
+    return found
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--catalog", type=int, default=100_000)
+    ap.add_argument("--ids", type=int, default=10_000)
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--legacy", action="store_true")
+    args = ap.parse_args()
+
+    main.startup()
+    main.load_catalog(scaled_catalog(main.build_jobs(), args.catalog))
+    client = TestClient(main.app)
+    rng = random.Random(7)
+
+    timings = []
+    for r in range(args.rounds):
+        # 10% of ids are repeats or unknown so every outcome path is exercised
+        ids = [f"j{rng.randint(1, args.catalog)}" for _ in range(int(args.ids * 0.9))]
+        ids += ids[: args.ids // 20] + [f"missing-{i}" for i in range(args.ids - len(ids) - args.ids // 20)]
+        start = time.perf_counter()
+        body = client.post("/api/apply/bulk", json={"user_id": f"bench-{r}", "job_ids": ids}).json()
+        timings.append(time.perf_counter() - start)
+        assert body["applied"] + body["duplicate"] + body["not_found"] == len(set(ids))
+
+    best = min(timings)
+    print(f"catalog={args.catalog} ids/call={args.ids} rounds={args.rounds}")
+    print(f"bulk apply: best {best*1000:.1f} ms/call, {args.ids/best:,.0f} ids/s "
+          f"(median {sorted(timings)[len(timings)//2]*1000:.1f} ms)")
+
+    if args.legacy:
+        start = time.perf_counter()
+        legacy_apply(ids)
+        took = time.perf_counter() - start
+        print(f"legacy scan: {took*1000:.1f} ms, {args.ids/took:,.0f} ids/s")
+
+
+if __name__ == "__main__":
+    main_()
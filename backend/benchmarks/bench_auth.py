@@ -0,0 +1,177 @@
+"""Login throughput, and search latency during a login storm.
+
+Drives the API in-process through httpx's ASGI transport against a fresh
+database of --users registered users:
+
+    login      POST /api/auth/login at each --concurrency level: logins/s,
+               p50/p99 latency, and how many were shed with 503
+    search     GET /api/jobs at --search-concurrency, alone and then while a
+               login storm of --storm concurrent logins runs (storm clients
+               honor Retry-After on 503)
+    verify     TokenSigner.verify cost per call, cached and uncached
+
+Prints a table and writes one JSON document (--out, default stdout).
+
+    cd backend && python benchmarks/bench_auth.py --concurrency 1,8,64 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from common import percentile_ms
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+
+
+def summary(latencies, wall: float, **extra) -> dict:
+    return {"requests": len(latencies), "throughput_rps": round(len(latencies) / wall, 1),
+            "p50_ms": percentile_ms(latencies, 50, 2),
+            "p99_ms": percentile_ms(latencies, 99, 2), **extra}
+
+
+async def run(args) -> dict:
+    import httpx
+    import main
+    from auth import TokenSigner, hash_password
+
+    main.startup()
+    stored = hash_password("bench-password", *main.HASHER.params)  # one hash, reused for every user
+    for i in range(args.users):
+        main.REPO.create_user({"id": f"u{i}", "name": f"User {i}", "email": f"u{i}@bench.test",
+                               "password": stored, "created_at": "2026-01-01"})
+    report = {"hash_workers": main.HASHER.workers, "hash_queue": main.HASHER.queue,
+              "scrypt": dict(zip("nrp", main.HASHER.params))}
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+
+        async def login(i: int):
+            start = time.perf_counter()
+            r = await client.post("/api/auth/login", json={"email": f"u{i % args.users}@bench.test",
+                                                           "password": "bench-password"})
+            if r.status_code == 503:
+                retry_after = float(r.headers.get("retry-after", 1))
+                return time.perf_counter() - start, r.status_code, retry_after
+            return time.perf_counter() - start, r.status_code, 0.0
+
+        async def logins(requests: int, concurrency: int):
+            sem = asyncio.Semaphore(concurrency)
+            latencies, codes = [], {}
+
+            async def one(i):
+                async with sem:
+                    seconds, code, _ = await login(i)
+                codes[code] = codes.get(code, 0) + 1
+                if code == 200:
+                    latencies.append(seconds)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(requests)))
+            wall = time.perf_counter() - start
+            return {**summary(latencies or [0.0], wall), "ok": codes.get(200, 0), "shed_503": codes.get(503, 0),
+                    "logins_per_s": round(codes.get(200, 0) / wall, 1)}
+
+        report["login"] = {}
+        for c in [int(x) for x in args.concurrency.split(",")]:
+            report["login"][c] = await logins(args.requests, c)
+
+        async def searches(stop: asyncio.Event):
+            sem = asyncio.Semaphore(args.search_concurrency)
+            latencies = []
+
+            async def one(i):
+                async with sem:
+                    start = time.perf_counter()
+                    r = await client.get("/api/jobs", params={"q": ["react", "python", "data", ""][i % 4], "limit": 20})
+                    latencies.append(time.perf_counter() - start)
+                    r.raise_for_status()
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(args.searches)))
+            stop.set()
+            return summary(latencies, time.perf_counter() - start)
+
+        report["search_alone"] = await searches(asyncio.Event())
+
+        async def storm(stop: asyncio.Event):
+            done, shed = 0, 0
+
+            async def worker(w):
+                nonlocal done, shed
+                i = w
+                while not stop.is_set():
+                    _, code, retry_after = await login(i)
+                    done += code == 200
+                    shed += code == 503
+                    i += args.storm
+                    if retry_after:  # well-behaved clients back off as told
+                        await asyncio.sleep(retry_after)
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(w) for w in range(args.storm)))
+            wall = time.perf_counter() - start
+            return {"concurrency": args.storm, "ok": done, "shed_503": shed, "logins_per_s": round(done / wall, 1)}
+
+        stop = asyncio.Event()
+        storm_task = asyncio.ensure_future(storm(stop))
+        await asyncio.sleep(0.5)  # let the storm fill the hash queue first
+        report["search_during_storm"] = await searches(stop)
+        report["storm"] = await storm_task
+
+    signer = TokenSigner(b"bench-secret", cache_size=args.users)
+    tokens = [signer.issue(f"u{i}") for i in range(args.users)]
+    start = time.perf_counter()
+    for t in tokens:
+        signer.verify(t)
+    miss = (time.perf_counter() - start) / len(tokens)
+    start = time.perf_counter()
+    for _ in range(10):
+        for t in tokens:
+            signer.verify(t)
+    hit = (time.perf_counter() - start) / (10 * len(tokens))
+    report["verify_us"] = {"uncached": round(miss * 1e6, 2), "cached": round(hit * 1e6, 2)}
+    return report
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=500)
+    ap.add_argument("--concurrency", default="1,8,64", help="comma-separated login concurrency levels")
+    ap.add_argument("--requests", type=int, default=200, help="logins per concurrency level")
+    ap.add_argument("--searches", type=int, default=500)
+    ap.add_argument("--search-concurrency", type=int, default=8)
+    ap.add_argument("--storm", type=int, default=128, help="concurrent logins during the search run")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ.update({"APPLYAI_DB": os.path.join(tmp.name, "bench.db"), "CATALOG_SNAPSHOT": "",
+                       "STATUS_SCHEDULER": "0", "JOB_FIXTURE_FILE": "", "ADZUNA_APP_ID": ""})
+    sys.path.insert(0, BACKEND_DIR)
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        tmp.cleanup()
+
+    for c, r in report["login"].items():
+        print(f"  login c={c:<4} {r['logins_per_s']:>7} logins/s  p50={r['p50_ms']:>8} ms  "
+              f"p99={r['p99_ms']:>8} ms  shed={r['shed_503']}", file=sys.stderr)
+    for name in ("search_alone", "search_during_storm"):
+        r = report[name]
+        print(f"  {name:<20} {r['throughput_rps']:>7} req/s  p50={r['p50_ms']:>8} ms  p99={r['p99_ms']:>8} ms",
+              file=sys.stderr)
+    print(f"  storm: {report['storm']}  verify: {report['verify_us']} µs", file=sys.stderr)
+    doc = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(doc + "\n")
+    else:
+        print(doc)
+
+
+if __name__ == "__main__":
+    main_()
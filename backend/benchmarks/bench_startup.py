@@ -0,0 +1,87 @@
+"""Cold-boot benchmark: import-to-ready latency of the API process.
+
+Each run is a fresh interpreter, timed in three stages:
+
+* import: `import main` (framework, routes, config; no I/O)
+* startup: the lifespan hook (migrate, load catalog, build indexes)
+* first request: one GET /api/jobs once the app is ready
+
+`cold` runs delete the catalog snapshot first, so the catalog is parsed and
+indexed from SQLite and the snapshot is rewritten. `warm` runs memory-map
+the snapshot that the previous run left behind. The catalog is the demo
+catalog scaled to --catalog jobs. Prints one JSON object with the median of
+--runs runs per mode.
+
+    cd backend && python benchmarks/bench_startup.py --catalog 100000 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    t2 = time.perf_counter()
+    assert client.get("/api/jobs?limit=20").status_code == 200
+    t3 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "startup_ms": (t2 - t1) * 1000,
+                  "first_request_ms": (t3 - t2) * 1000}))
+"""
+
+SEED = """
+import sys
+import main
+from benchmarks.common import scaled_catalog
+main.startup()
+main.REPO.replace_jobs(scaled_catalog(main.build_jobs(), int(sys.argv[1])))
+"""
+
+
+def run(code: str, env: dict, *argv: str) -> str:
+    out = subprocess.run([sys.executable, "-c", code, *argv], cwd=BACKEND_DIR, env=env,
+                         capture_output=True, text=True, check=True)
+    return out.stdout.strip().splitlines()[-1] if out.stdout.strip() else ""
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--catalog", type=int, default=50)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "bench.db")
+        snapshot = db + ".catalog"
+        env = {**os.environ, "APPLYAI_DB": db, "CATALOG_SNAPSHOT": snapshot, "STATUS_SCHEDULER": "0"}
+        run(SEED, env, str(args.catalog))
+
+        report = {"catalog": args.catalog, "runs": args.runs}
+        for mode in ("cold", "warm"):
+            samples = []
+            for _ in range(args.runs):
+                if mode == "cold" and os.path.exists(snapshot):
+                    os.unlink(snapshot)
+                samples.append(json.loads(run(CHILD, env)))
+            report[mode] = {k: round(statistics.median(s[k] for s in samples), 1) for k in samples[0]}
+            report[mode]["ready_ms"] = round(report[mode]["import_ms"] + report[mode]["startup_ms"], 1)
+        report["snapshot_bytes"] = os.path.getsize(snapshot)
+
+    for mode in ("cold", "warm"):
+        r = report[mode]
+        print(f"{mode:5s} import {r['import_ms']:7.1f} ms  startup {r['startup_ms']:7.1f} ms  "
+              f"ready {r['ready_ms']:7.1f} ms  first request {r['first_request_ms']:6.1f} ms")
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,166 @@
+"""Upstream protection against a local mock Adzuna server.
+
+Starts benchmarks/mock_adzuna.py on a free port, points the Adzuna provider
+at it and drives /api/jobs in-process through httpx's ASGI transport.
+
+Scenarios (providers are rebuilt and counters reset before each):
+
+    herd      --requests users search the same query at once. Single-flight
+              should make this one upstream call per page.
+    spread    every request is a different query from a different user, so
+              the global bucket and the bounded queue shed the excess to
+              catalog-only answers.
+    one_user  one user sends --requests different queries back to back. Past
+              its burst, the per-user bucket sheds them.
+    repeat    spread's queries again after their TTL has expired, with the
+              global budget at zero tokens. Shed calls are answered from the
+              stale cache.
+
+For each scenario it reports the upstream calls the mock saw, the provider
+counters (coalesced, shed by reason, stale answers) and p50/p99 latency.
+
+    cd backend && python benchmarks/bench_upstream.py --requests 200 --latency 0.3
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import free_port, percentile_ms
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+
+
+async def wait_ready(client, url: str, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            await client.get(url)
+            return
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def run(args, mock_url: str) -> dict:
+    import httpx
+    import main
+    from providers import ProviderStats, Throttle
+
+    main.startup()
+    transport = httpx.ASGITransport(app=main.app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client, \
+            httpx.AsyncClient(base_url=mock_url) as mock:
+        await wait_ready(mock, "/stats")
+
+        async def scenario(name: str, requests, sequential: bool = False, fresh: bool = True, setup=None):
+            if fresh:
+                main.PROVIDERS[:] = main.build_providers()
+            if setup:
+                setup(main.PROVIDERS[0])
+            main.PROVIDERS[0].stats = ProviderStats()
+            await mock.post("/reset")
+            latencies = []
+
+            async def one(params):
+                # Callers are billed by token subject, so each user signs in
+                headers = {"Authorization": "Bearer " + main.TOKENS.issue(params["user_id"])}
+                start = time.perf_counter()
+                r = await client.get("/api/jobs", params=params, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                r.raise_for_status()
+
+            start = time.perf_counter()
+            if sequential:
+                for params in requests:
+                    await one(params)
+            else:
+                await asyncio.gather(*(one(params) for params in requests))
+            wall = time.perf_counter() - start
+            while main.PROVIDERS[0]._inflight:  # calls outliving their callers' budget still land in the cache
+                await asyncio.sleep(0.05)
+            upstream = (await mock.get("/stats")).json()
+            stats = main.PROVIDERS[0].stats.as_dict()
+            results[name] = {
+                "requests": len(requests), "upstream_calls": upstream["calls"],
+                "upstream_max_concurrent": upstream["max_concurrent"],
+                "coalesced": stats["coalesced"], "shed": stats["shed"], "stale_served": stats["stale_served"],
+                "wall_s": round(wall, 3),
+                "p50_ms": percentile_ms(latencies, 50, 2),
+                "p99_ms": percentile_ms(latencies, 99, 2),
+            }
+
+        n = args.requests
+        await scenario("herd", [{"q": "react developer", "user_id": f"u{i}"} for i in range(n)])
+        spread = [{"q": f"engineer {i}", "user_id": f"u{i}"} for i in range(n)]
+        await scenario("spread", spread)
+        await scenario("one_user", [{"q": f"engineer {i}", "user_id": "solo"} for i in range(n)], sequential=True)
+
+        def unthrottled(provider):
+            provider.throttle = Throttle(concurrency=n, queue=n)
+
+        def expire(provider):
+            # Age every cached answer past its TTL and leave no upstream budget
+            provider.cache.ttl = 0.0
+            provider.throttle = Throttle(rate=1.0, burst=1)
+            provider.throttle.bucket.rate = provider.throttle.bucket.tokens = 0.0
+        await scenario("warm", spread, setup=unthrottled)
+        await scenario("repeat", spread, fresh=False, setup=expire)
+        del results["warm"]
+    return results
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--latency", type=float, default=0.3, help="mock upstream latency (s)")
+    ap.add_argument("--rate", default="5", help="PROVIDER_RATE_PER_S")
+    ap.add_argument("--burst", default="10", help="PROVIDER_BURST")
+    ap.add_argument("--user-rate", default="0.5", help="USER_RATE_PER_S")
+    ap.add_argument("--user-burst", default="5", help="USER_BURST")
+    ap.add_argument("--concurrency", default="8", help="PROVIDER_CONCURRENCY")
+    ap.add_argument("--queue", default="32", help="PROVIDER_QUEUE")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    port = free_port()
+    mock = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "mock_adzuna.py"),
+                             "--port", str(port), "--latency", str(args.latency)])
+    tmp = tempfile.TemporaryDirectory()
+    os.environ.update({
+        "ADZUNA_APP_ID": "bench", "ADZUNA_APP_KEY": "bench", "ADZUNA_BASE_URL": f"http://127.0.0.1:{port}",
+        "PROVIDER_RATE_PER_S": args.rate, "PROVIDER_BURST": args.burst,
+        "USER_RATE_PER_S": args.user_rate, "USER_BURST": args.user_burst,
+        "PROVIDER_CONCURRENCY": args.concurrency, "PROVIDER_QUEUE": args.queue,
+        "APPLYAI_DB": os.path.join(tmp.name, "bench.db"), "CATALOG_SNAPSHOT": "",
+        "STATUS_SCHEDULER": "0", "JOB_FIXTURE_FILE": "",
+    })
+    sys.path.insert(0, BACKEND_DIR)
+    try:
+        results = asyncio.run(run(args, f"http://127.0.0.1:{port}"))
+    finally:
+        mock.terminate()
+        mock.wait()
+        tmp.cleanup()
+
+    for name, r in results.items():
+        print(f"  {name:<9} requests={r['requests']:<5} upstream={r['upstream_calls']:<5} "
+              f"coalesced={r['coalesced']:<5} shed={r['shed']} stale={r['stale_served']} "
+              f"p50={r['p50_ms']} ms p99={r['p99_ms']} ms", file=sys.stderr)
+    doc = json.dumps({"config": vars(args), "scenarios": results}, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(doc + "\n")
+    else:
+        print(doc)
+
+
+if __name__ == "__main__":
+    main_()
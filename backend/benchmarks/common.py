@@ -0,0 +1,42 @@
+"""Helpers shared by the benchmark scripts.
+
+Scripts run as `python benchmarks/<name>.py` from `backend/`, so this module
+is importable as `common`; code run from `backend/` imports it as
+`benchmarks.common`.
+"""
+import random
+import socket
+from typing import List, Optional, Sequence
+
+
+def percentile(samples: Sequence[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile; None when there are no samples."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def percentile_ms(samples: Sequence[float], p: float, digits: int = 2) -> Optional[float]:
+    """`percentile` of samples in seconds, as rounded milliseconds (None when empty)."""
+    value = percentile(samples, p)
+    return None if value is None else round(1000 * value, digits)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def scaled_catalog(base: List[dict], n: int, rng: Optional[random.Random] = None) -> List[dict]:
+    """`base` repeated to `n` jobs with ids j1..jn; with `rng`, copies past the
+    first round get new locations and match scores."""
+    locations = sorted({j["location"] for j in base})
+    jobs = []
+    for i in range(n):
+        j = base[i % len(base)]
+        if rng is not None and i >= len(base):
+            j = {**j, "location": rng.choice(locations), "match": rng.randint(55, 99)}
+        jobs.append({**j, "id": f"j{i + 1}"})
+    return jobs
@@ -0,0 +1,194 @@
+"""Concurrent load test for the stateful endpoints across worker counts.
+
+Starts `uvicorn main:app --workers N` on a fresh SQLite file for each N in
+--workers, then hammers register / login / profile save / bulk apply /
+applications / stats in parallel and checks that nothing was lost or
+duplicated:
+
+* every email registered concurrently --dup-registrations times succeeds once
+* every user's applications equal the union of job ids sent by all of their
+  overlapping concurrent bulk applies, with no job applied twice
+
+The server runs with AUTH_REQUIRED=1, so user-scoped calls carry the login
+token. Logins shed with 503 are retried after Retry-After, like a real client.
+
+Prints p50/p99 latency per endpoint and one JSON line per worker count.
+
+    cd backend && python benchmarks/load_test.py --workers 1,2,4 --users 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+from common import free_port, percentile_ms
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOG_IDS = [f"j{i}" for i in range(1, 51)]
+
+
+class Recorder:
+    def __init__(self, client: httpx.AsyncClient, concurrency: int):
+        self.client = client
+        self.sem = asyncio.Semaphore(concurrency)
+        self.latency = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.retries = defaultdict(int)
+
+    async def call(self, name: str, method: str, url: str, **kw) -> httpx.Response:
+        while True:
+            async with self.sem:
+                start = time.perf_counter()
+                r = await self.client.request(method, url, **kw)
+                self.latency[name].append(time.perf_counter() - start)
+            if r.status_code != 503 or "retry-after" not in r.headers:
+                break
+            self.retries[name] += 1
+            await asyncio.sleep(float(r.headers["retry-after"]))
+        if r.status_code >= 500:
+            self.errors[name] += 1
+        return r
+
+
+async def run_scenario(base: str, args) -> dict:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60.0) as client:
+        rec = Recorder(client, args.concurrency)
+        problems = []
+        users = [f"load-{i}@example.com" for i in range(args.users)]
+
+        # register: the same email raced several times must succeed exactly once
+        regs = [rec.call("register", "POST", "/api/auth/register",
+                         json={"name": f"User {i}", "email": email, "password": "pw"})
+                for i, email in enumerate(users) for _ in range(args.dup_registrations)]
+        results = await asyncio.gather(*regs)
+        uid_by_email = {}
+        ok_by_email = defaultdict(int)
+        for r in results:
+            if r.status_code == 200:
+                body = r.json()
+                ok_by_email[body["email"]] += 1
+                uid_by_email[body["email"]] = body["user_id"]
+        for email in users:
+            if ok_by_email[email] != 1:
+                problems.append(f"{email}: {ok_by_email[email]} successful registrations")
+
+        logins = [rec.call("login", "POST", "/api/auth/login", json={"email": e, "password": "pw"}) for e in users]
+        auth = {}
+        for r in await asyncio.gather(*logins):
+            if r.status_code == 200:
+                auth[r.json()["user_id"]] = {"Authorization": f"Bearer {r.json()['token']}"}
+        if len(auth) != len(users):
+            problems.append(f"{len(users) - len(auth)} logins failed")
+
+        uids = [uid for uid in uid_by_email.values() if uid in auth]
+        profiles = [rec.call("profile", "POST", "/api/profile/save", headers=auth[uid], json={
+            "user_id": uid, "name": "Load", "email": "load@example.com", "phone": "0", "location": "Bangalore",
+            "experience": "3 years", "skills": ["React", "Python"], "job_titles": ["Engineer"],
+            "salary_min": 10, "salary_max": 20, "job_type": "Full-time", "preferred_locations": ["Remote"]})
+            for uid in uids]
+        await asyncio.gather(*profiles)
+
+        # bulk apply: overlapping id sets per user, interleaved with reads
+        expected = {}
+        calls = []
+        for uid in uids:
+            batches = [rng.sample(CATALOG_IDS, args.ids_per_apply) for _ in range(args.applies_per_user)]
+            expected[uid] = set().union(*batches)
+            calls += [rec.call("apply", "POST", "/api/apply/bulk", headers=auth[uid],
+                               json={"user_id": uid, "job_ids": b}) for b in batches]
+            calls += [rec.call("applications", "GET", f"/api/applications/{uid}", headers=auth[uid],
+                               params={"limit": 100}),
+                      rec.call("stats", "GET", f"/api/stats/{uid}", headers=auth[uid])]
+        rng.shuffle(calls)
+        responses = await asyncio.gather(*calls)
+        applied_by_user = defaultdict(int)
+        for r in responses:
+            if r.request.url.path == "/api/apply/bulk" and r.status_code == 200:
+                applied_by_user[json.loads(r.request.content)["user_id"]] += r.json()["applied"]
+
+        checks = [rec.call("applications", "GET", f"/api/applications/{uid}", headers=auth[uid],
+                           params={"limit": 100}) for uid in uids]
+        for uid, r in zip(uids, await asyncio.gather(*checks)):
+            job_ids = [a["job_id"] for a in r.json()["applications"]]
+            if len(job_ids) != len(set(job_ids)):
+                problems.append(f"{uid}: duplicate applications")
+            if set(job_ids) != expected[uid]:
+                problems.append(f"{uid}: lost applications ({len(expected[uid] - set(job_ids))} missing)")
+            if applied_by_user[uid] != len(expected[uid]):
+                problems.append(f"{uid}: {applied_by_user[uid]} 'applied' outcomes for {len(expected[uid])} jobs")
+
+        return {
+            "latency_ms": {name: {"n": len(s), "p50": percentile_ms(s, 50, 2),
+                                  "p99": percentile_ms(s, 99, 2)}
+                           for name, s in rec.latency.items()},
+            "server_errors": dict(rec.errors),
+            "retries_after_503": dict(rec.retries),
+            "problems": problems,
+        }
+
+
+def start_server(workers: int, db_path: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "APPLYAI_DB": db_path, "AUTH_REQUIRED": "1"}
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+           "--workers", str(workers), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/providers", timeout=1).status_code == 200:
+                return proc
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", default="1,2,4")
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--dup-registrations", type=int, default=3)
+    ap.add_argument("--applies-per-user", type=int, default=4)
+    ap.add_argument("--ids-per-apply", type=int, default=15)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    failed = False
+    for workers in [int(w) for w in args.workers.split(",")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            port = free_port()
+            proc = start_server(workers, os.path.join(tmp, "load.db"), port)
+            try:
+                start = time.perf_counter()
+                report = asyncio.run(run_scenario(f"http://127.0.0.1:{port}", args))
+                report["elapsed_s"] = round(time.perf_counter() - start, 2)
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+
+        report["workers"] = workers
+        verdict = f"{len(report['problems'])} PROBLEMS" if report["problems"] else "OK"
+        print(f"\n── {workers} worker(s): {report['elapsed_s']}s, {verdict}")
+        for name, lat in report["latency_ms"].items():
+            print(f"  {name:<13} n={lat['n']:<6} p50={lat['p50']:>8} ms  p99={lat['p99']:>8} ms")
+        for p in report["problems"][:20]:
+            print(f"  ✗ {p}")
+        print(json.dumps(report))
+        failed = failed or bool(report["problems"] or report["server_errors"])
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Local Adzuna-shaped search server for exercising the live provider path.
+
+Serves GET /v1/api/jobs/in/search/{page} from a saved search response,
+filtering titles by `what` and paging by `results_per_page`, after an
+artificial --latency. Every upstream call is counted, so coalescing and
+rate limiting can be checked from outside:
+
+    GET  /stats   {"calls": n, "by_query": {"react|india|1": n, ...}, "max_concurrent": n}
+    POST /reset   zero the counters
+
+    cd backend && python benchmarks/mock_adzuna.py --port 8765 --latency 0.3
+    ADZUNA_APP_ID=x ADZUNA_APP_KEY=y ADZUNA_BASE_URL=http://127.0.0.1:8765 python main.py
+"""
+import argparse
+import asyncio
+import json
+import os
+from collections import Counter
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FIXTURE = os.path.join(BACKEND_DIR, "fixtures", "adzuna_search.json")
+
+
+def build_app(fixture: str = DEFAULT_FIXTURE, latency: float = 0.0) -> Starlette:
+    with open(fixture, encoding="utf-8") as f:
+        results = json.load(f).get("results", [])
+    calls: Counter = Counter()
+    state = {"active": 0, "max_concurrent": 0}
+
+    async def search(request):
+        params = request.query_params
+        if not params.get("app_id") or not params.get("app_key"):
+            return JSONResponse({"exception": "AUTH_FAIL"}, status_code=401)
+        page = int(request.path_params["page"])
+        what = params.get("what", "").lower()
+        calls[f"{what}|{params.get('where', '').lower()}|{page}"] += 1
+        state["active"] += 1
+        state["max_concurrent"] = max(state["max_concurrent"], state["active"])
+        try:
+            if latency:
+                await asyncio.sleep(latency)
+        finally:
+            state["active"] -= 1
+        per_page = int(params.get("results_per_page", 20))
+        hits = [j for j in results if what in j.get("title", "").lower()]
+        lo = (page - 1) * per_page
+        return JSONResponse({"count": len(hits), "results": hits[lo:lo + per_page]})
+
+    async def stats(request):
+        return JSONResponse({"calls": sum(calls.values()), "by_query": dict(calls),
+                             "max_concurrent": state["max_concurrent"]})
+
+    async def reset(request):
+        calls.clear()
+        state["max_concurrent"] = 0
+        return JSONResponse({"ok": True})
+
+    return Starlette(routes=[Route("/v1/api/jobs/in/search/{page:int}", search),
+                             Route("/stats", stats), Route("/reset", reset, methods=["POST"])])
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.3, help="seconds per upstream call")
+    ap.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    args = ap.parse_args()
+    uvicorn.run(build_app(args.fixture, args.latency), host=args.host, port=args.port, log_level="warning")
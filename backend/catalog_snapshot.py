@@ -0,0 +1,104 @@
+"""Prebuilt catalog snapshots.
+
+Parsing the stored catalog and building its indexes is the bulk of startup.
+A snapshot is that finished state (records, JobIndex, MatchEngine) written
+once with pickle protocol 5. NumPy arrays go out of band into page-aligned
+segments of the same file. On load the file is memory-mapped and the arrays
+point straight into the mapping, so they cost no parse time and every worker
+on the host shares one copy through the page cache. The records and index
+sets are still unpickled into each worker's own memory.
+
+Layout: MAGIC | u32 header length | JSON header | aligned segments. The
+header carries the catalog version the snapshot was built from, a code
+version, and the offset and length of the pickle stream and of each array
+buffer. The code version hashes the modules whose objects are pickled (plus
+the Python and NumPy versions), so a deploy that changes their layout
+rebuilds the snapshot at boot instead of unpickling stale objects.
+
+Snapshots are only ever read from files this process (or a sibling worker)
+wrote next to the database; do not point CATALOG_SNAPSHOT at untrusted input.
+"""
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import tempfile
+from typing import Any, Optional
+
+import numpy as np
+
+MAGIC = b"APPLYAI-CATALOG2"
+ALIGN = 4096
+# Modules defining the classes inside a snapshot (JobRecord, SkillTable, JobIndex, MatchEngine)
+PICKLED_MODULES = ("records.py", "job_index.py", "scoring.py")
+
+
+def _code_version() -> str:
+    h = hashlib.blake2b(digest_size=16)
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in PICKLED_MODULES:
+        with open(os.path.join(here, name), "rb") as f:
+            h.update(name.encode() + b"\0" + f.read())
+    h.update(f"python {sys.version_info[:2]} numpy {np.__version__}".encode())
+    return h.hexdigest()
+
+
+CODE_VERSION = _code_version()
+
+
+def save(path: str, version: str, payload: Any):
+    """Atomically write `payload` as the snapshot for catalog `version`."""
+    buffers = []
+    stream = pickle.dumps(payload, protocol=5, buffer_callback=buffers.append)
+    chunks = [stream] + [b.raw() for b in buffers]
+    sizes = [c.nbytes if isinstance(c, memoryview) else len(c) for c in chunks]
+    # The header records segment offsets, which depend on the header's own size
+    header_size = ALIGN
+    while True:
+        offsets, pos = [], header_size
+        for n in sizes:
+            offsets.append([pos, n])
+            pos += -(-n // ALIGN) * ALIGN
+        header = json.dumps({"version": version, "code": CODE_VERSION, "segments": offsets}).encode()
+        if len(MAGIC) + 4 + len(header) <= header_size:
+            break
+        header_size *= 2
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".catalog-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(header)) + header)
+            for (offset, _), chunk in zip(offsets, chunks):
+                f.seek(offset)
+                f.write(chunk)
+            f.truncate(pos)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)  # readers see the old snapshot or the new one, never half of one
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load(path: str, version: str) -> Optional[Any]:
+    """The payload saved for `version` by this code, or None if the file is missing or stale."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        prefix = f.read(len(MAGIC) + 4)
+        if len(prefix) < len(MAGIC) + 4 or prefix[:len(MAGIC)] != MAGIC:
+            return None
+        (size,) = struct.unpack("<I", prefix[len(MAGIC):])
+        header = json.loads(f.read(size))
+        if header["version"] != version or header.get("code") != CODE_VERSION:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    (start, length), *segments = header["segments"]
+    # Arrays keep the mapping alive through their buffers; the pickle stream is copied out
+    return pickle.loads(view[start:start + length].tobytes(),
+                        buffers=[view[o:o + n] for o, n in segments])
@@ -0,0 +1,125 @@
+"""Response compression with Accept-Encoding negotiation.
+
+Bodies of at least `minimum_size` bytes are compressed with brotli when the
+client accepts it and the `brotli` package is installed, otherwise with
+gzip. Three kinds of response are never touched: anything that already has
+a Content-Encoding, partial content (206 or Content-Range, whose byte ranges
+refer to the uncompressed body), and streamed NDJSON/SSE, where compressor
+buffering would hold frames back from the client. Other streamed bodies,
+such as static files, are compressed chunk by chunk. Large single-message
+bodies are compressed in a worker thread so the event loop keeps serving.
+
+A compressed body is no longer byte-identical to the one its ETag names, so
+strong ETags are weakened (`W/"..."`). Conditional GETs still match, and
+If-Range, which needs a strong ETag, falls back to a full response.
+"""
+import asyncio
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Optional: brotli compresses JSON ~15-20% smaller than gzip at similar CPU cost
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+STREAMING_TYPES = ("text/event-stream", "application/x-ndjson")
+THREAD_THRESHOLD = 256 * 1024
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick 'br' or 'gzip' from an Accept-Encoding header (q=0 disables a coding)."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip()] = q
+    if BROTLI_AVAILABLE and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", accepted.get("*", 0)) > 0:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, coding: str, gzip_level: int, brotli_quality: int):
+        if coding == "br":
+            self._c = brotli.Compressor(quality=brotli_quality)
+            self._write, self._finish = self._c.process, self._c.finish
+        else:
+            self._c = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._write, self._finish = self._c.compress, self._c.flush
+
+    def compress(self, data: bytes, last: bool) -> bytes:
+        out = self._write(data)
+        return out + self._finish() if last else out
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        mode = None  # None until the first body message decides: "pass", "whole" or "stream"
+        compressor: Optional[_Compressor] = None
+
+        async def compressing_send(message):
+            nonlocal start_message, mode, compressor
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+            body, more = message.get("body", b""), message.get("more_body", False)
+
+            if mode is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                ctype = headers.get("content-type", "")
+                if ("content-encoding" in headers or ctype.startswith(STREAMING_TYPES)
+                        or start_message["status"] == 206 or "content-range" in headers
+                        or (not more and len(body) < self.minimum_size)):
+                    mode = "pass"
+                else:
+                    mode = "stream" if more else "whole"
+                    compressor = _Compressor(coding, self.gzip_level, self.brotli_quality)
+                    headers["Content-Encoding"] = coding
+                    headers.add_vary_header("Accept-Encoding")
+                    if "content-length" in headers:
+                        del headers["content-length"]
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        headers["ETag"] = "W/" + etag
+                    if mode == "whole":
+                        if len(body) >= THREAD_THRESHOLD:
+                            body = await asyncio.to_thread(compressor.compress, body, True)
+                        else:
+                            body = compressor.compress(body, True)
+                        headers["Content-Length"] = str(len(body))
+                        message = {**message, "body": body}
+                await send(start_message)
+
+            if mode == "stream":
+                message = {**message, "body": compressor.compress(body, not more)}
+            await send(message)
+
+        await self.app(scope, receive, compressing_send)
+        if start_message is not None and mode is None:  # response ended without a body message
+            await send(start_message)
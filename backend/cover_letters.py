@@ -0,0 +1,104 @@
+"""Cover letter templates.
+
+Each tone is a plain `{field}` template compiled once at import into a tuple
+of (literal text, field name) pieces, so rendering is a single join with no
+re-parsing. `CoverLetterWriter` memoizes finished letters in an LRU keyed on
+(tone, job title, company, skills, experience, name); bulk flows that write
+the same letter again (re-applies, identical postings on several portals)
+get it for free.
+"""
+import threading
+from collections import OrderedDict
+from string import Formatter
+from typing import Dict, Optional, Sequence, Tuple
+
+PROFESSIONAL = """Dear Hiring Manager at {company},
+
+I am writing to express my strong interest in the {job_title} position at {company}. With {experience} of hands-on industry experience specializing in {skills_str}, I am excited by the opportunity to contribute to your team.
+
+In my previous roles, I have successfully built and scaled production-grade systems using {primary_skill}, delivering measurable improvements in performance, reliability, and user experience. I am particularly drawn to {company} because of its reputation for technical excellence, fast-paced innovation culture, and the meaningful impact its products create for millions of users.
+
+Key highlights I would bring to this role:
+• Deep expertise in {skills_str}
+• Track record of delivering scalable solutions in agile environments
+• Strong collaboration with cross-functional teams and stakeholders
+• Passion for writing clean, well-tested, maintainable code
+
+I am confident that my background aligns strongly with what you're looking for, and I would welcome the chance to discuss how I can contribute to {company}'s engineering goals.
+
+Thank you for your time and consideration.
+
+Warm regards,
+{name}"""
+
+ENTHUSIASTIC = """Hi {company} team,
+
+I was thrilled to see the {job_title} opening at {company} — it is exactly the kind of role I have been working towards! I bring {experience} of building real products with {skills_str}, and I would love to bring that energy to your team.
+
+Most recently I have been shipping features end to end with {primary_skill}, obsessing over performance and the details users actually notice. {company}'s products and engineering culture are a big part of why this role stands out to me.
+
+What I would bring from day one:
+• Hands-on strength in {skills_str}
+• A habit of shipping quickly without cutting corners
+• Curiosity, ownership and a love of learning from teammates
+
+I would be delighted to chat about how I can help {company} build what comes next.
+
+Cheers,
+{name}"""
+
+CONCISE = """Dear Hiring Manager,
+
+I am applying for the {job_title} role at {company}. I have {experience} of experience with {skills_str}, most recently building production systems in {primary_skill}.
+
+I would welcome the opportunity to discuss how I can contribute to {company}.
+
+Regards,
+{name}"""
+
+TEMPLATES = {"professional": PROFESSIONAL, "enthusiastic": ENTHUSIASTIC, "concise": CONCISE}
+DEFAULT_TONE = "professional"
+
+Compiled = Tuple[Tuple[str, Optional[str]], ...]
+
+
+def compile_template(text: str) -> Compiled:
+    return tuple((literal, field) for literal, field, _, _ in Formatter().parse(text))
+
+
+COMPILED: Dict[str, Compiled] = {tone: compile_template(text) for tone, text in TEMPLATES.items()}
+
+
+def render(compiled: Compiled, values: Dict[str, str]) -> str:
+    return "".join(literal + (values[field] if field is not None else "") for literal, field in compiled)
+
+
+class CoverLetterWriter:
+    def __init__(self, cache_size: int = 4096):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def letter(self, job_title: str, company: str, skills: Sequence[str], experience: str,
+               name: str, tone: str = DEFAULT_TONE) -> str:
+        """Render (or fetch) one letter; raises KeyError for an unknown tone."""
+        compiled = COMPILED[tone]
+        key = (tone, job_title, company, tuple(skills[:4]), experience, name)
+        with self._lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return text
+            self.misses += 1
+        text = render(compiled, {
+            "job_title": job_title, "company": company, "experience": experience, "name": name,
+            "skills_str": ", ".join(skills[:4]) or "software development",
+            "primary_skill": skills[0] if skills else "software development",
+        })
+        with self._lock:
+            self._cache[key] = text
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return text
@@ -0,0 +1,172 @@
+"""In-memory inverted index over the job catalog (a list of JobRecord).
+
+Built once whenever the catalog is (re)loaded so that /api/jobs filters become
+set intersections and range scans instead of full list scans per request.
+Results are catalog positions in ascending order, so callers keep the same
+ordering the original list comprehensions produced.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from records import JobRecord
+
+# Locations that match every location filter (mirrors the dashboard rule)
+ANYWHERE_LOCATIONS = ("Remote", "Pan India")
+GRAM = 3
+
+
+def _grams(s: str) -> Set[str]:
+    return {s[i:i + GRAM] for i in range(len(s) - GRAM + 1)}
+
+
+def job_matches(job: JobRecord, q: str = "", skills: str = "", location: str = "All",
+                portal: str = "All", min_match: int = 0,
+                salary_min: Optional[float] = None, salary_max: Optional[float] = None,
+                exp_min: Optional[float] = None, exp_max: Optional[float] = None) -> bool:
+    """Reference predicate with the exact /api/jobs filter semantics.
+
+    Used for small ad-hoc lists (e.g. live provider results) that are not worth
+    indexing. Range filters keep jobs whose range overlaps the requested one;
+    jobs that do not state a range never match a range filter.
+    """
+    if skills:
+        sl = [s.strip().lower() for s in skills.split(",")]
+        job_skills = [sk.lower() for sk in job.skills]
+        if not any(s in job_skills for s in sl):
+            return False
+    if location and location != "All":
+        if not (location.lower() in job.location.lower() or job.location in ANYWHERE_LOCATIONS):
+            return False
+    if portal and portal != "All" and job.portal != portal:
+        return False
+    if q and not (q.lower() in job.title.lower() or q.lower() in job.company.lower()):
+        return False
+    if min_match and job.match < min_match:
+        return False
+    if salary_min is not None and not job.salary_max >= salary_min:
+        return False
+    if salary_max is not None and not job.salary_min <= salary_max:
+        return False
+    if exp_min is not None and not job.exp_max >= exp_min:
+        return False
+    if exp_max is not None and not job.exp_min <= exp_max:
+        return False
+    return True
+
+
+class _Sorted:
+    """Positions ordered by one numeric field, for range scans (NaNs left out)."""
+
+    def __init__(self, values: Sequence[float]):
+        self.order = sorted((p for p, v in enumerate(values) if v == v), key=values.__getitem__)
+        self.keys = [values[p] for p in self.order]
+
+    def at_least(self, lo: float) -> Set[int]:
+        return set(self.order[bisect_left(self.keys, lo):])
+
+    def at_most(self, hi: float) -> Set[int]:
+        return set(self.order[:bisect_right(self.keys, hi)])
+
+
+class JobIndex:
+    """Skill, portal, location, text and match indexes over a list of jobs."""
+
+    def __init__(self, jobs: List[JobRecord]):
+        self.jobs = jobs
+        self.by_id: Dict[str, int] = {}
+        self.by_skill: Dict[str, Set[int]] = defaultdict(set)
+        self.by_portal: Dict[str, Set[int]] = defaultdict(set)
+        self.by_location: Dict[str, Set[int]] = defaultdict(set)
+        # distinct lowercased title/company -> positions, plus trigram -> distinct strings
+        self.by_text: Dict[str, Set[int]] = defaultdict(set)
+        self.text_grams: Dict[str, Set[str]] = defaultdict(set)
+
+        for pos, j in enumerate(jobs):
+            self.by_id[j.id] = pos
+            for sk in j.skills:
+                self.by_skill[sk.lower()].add(pos)
+            self.by_portal[j.portal].add(pos)
+            self.by_location[j.location].add(pos)
+            self.by_text[j.title.lower()].add(pos)
+            self.by_text[j.company.lower()].add(pos)
+
+        for text in self.by_text:
+            for g in _grams(text):
+                self.text_grams[g].add(text)
+
+        self.by_match = _Sorted([j.match for j in jobs])
+        self.by_salary_min = _Sorted([j.salary_min for j in jobs])
+        self.by_salary_max = _Sorted([j.salary_max for j in jobs])
+        self.by_exp_min = _Sorted([j.exp_min for j in jobs])
+        self.by_exp_max = _Sorted([j.exp_max for j in jobs])
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        pos = self.by_id.get(job_id)
+        return None if pos is None else self.jobs[pos]
+
+    # ── Per-filter candidate sets ──
+    def _skills(self, skills: str) -> Set[int]:
+        out: Set[int] = set()
+        for s in skills.split(","):
+            out |= self.by_skill.get(s.strip().lower(), set())
+        return out
+
+    def _location(self, location: str) -> Set[int]:
+        needle = location.lower()
+        out: Set[int] = set()
+        for loc, positions in self.by_location.items():
+            if needle in loc.lower() or loc in ANYWHERE_LOCATIONS:
+                out |= positions
+        return out
+
+    def _text(self, q: str) -> Set[int]:
+        needle = q.lower()
+        if len(needle) >= GRAM:
+            grams = sorted((self.text_grams.get(g, set()) for g in _grams(needle)), key=len)
+            candidates: Iterable[str] = set.intersection(*grams) if grams else set()
+        else:
+            candidates = self.by_text.keys()
+        out: Set[int] = set()
+        for text in candidates:
+            if needle in text:
+                out |= self.by_text[text]
+        return out
+
+    def search(self, q: str = "", skills: str = "", location: str = "All",
+               portal: str = "All", min_match: int = 0,
+               salary_min: Optional[float] = None, salary_max: Optional[float] = None,
+               exp_min: Optional[float] = None, exp_max: Optional[float] = None) -> Sequence[int]:
+        """Return matching catalog positions in ascending order."""
+        sets: List[Set[int]] = []
+        if skills:
+            sets.append(self._skills(skills))
+        if location and location != "All":
+            sets.append(self._location(location))
+        if portal and portal != "All":
+            sets.append(self.by_portal.get(portal, set()))
+        if q:
+            sets.append(self._text(q))
+        if min_match:
+            sets.append(self.by_match.at_least(min_match))
+        if salary_min is not None:
+            sets.append(self.by_salary_max.at_least(salary_min))
+        if salary_max is not None:
+            sets.append(self.by_salary_min.at_most(salary_max))
+        if exp_min is not None:
+            sets.append(self.by_exp_max.at_least(exp_min))
+        if exp_max is not None:
+            sets.append(self.by_exp_min.at_most(exp_max))
+
+        if not sets:
+            return range(len(self.jobs))
+        sets.sort(key=len)
+        result: Optional[Set[int]] = set(sets[0])
+        for s in sets[1:]:
+            if not result:
+                break
+            result &= s
+        return sorted(result)
@@ -0,0 +1,25 @@
+"""Per-key lock striping for the sync (threadpool) handlers.
+
+Concurrency model: Starlette runs plain `def` handlers on a threadpool, so
+handlers that read-modify-write one user's data take that user's stripe lock.
+That serializes same-user work inside a worker without a global lock. Across
+workers, correctness comes from the database: SQLite serializes writers, and
+the uniqueness rules (one user per email, one application per user and job)
+are enforced by constraints inside IMMEDIATE transactions.
+"""
+import threading
+import zlib
+from typing import List
+
+
+class ShardedLocks:
+    """A fixed pool of locks; a key always maps to the same lock."""
+
+    def __init__(self, shards: int = 64):
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(shards)]
+
+    def __call__(self, key: str) -> threading.Lock:
+        return self._locks[zlib.crc32(key.encode()) % len(self._locks)]
+
+
+user_lock = ShardedLocks()
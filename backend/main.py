@@ -1,21 +1,52 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Header, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
-from typing import List, Optional
-import json, uuid, datetime, random, re, os
+from fastapi.responses import FileResponse, PlainTextResponse
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional, Tuple
+import asyncio, json, uuid, datetime, random, re, os, time, threading
 import urllib.parse
-
-# Optional: httpx for Adzuna API (if configured)
-try:
-    import httpx
-    HTTPX_AVAILABLE = True
-except ImportError:
-    HTTPX_AVAILABLE = False
+import numpy as np
+from bisect import bisect_left
+
+from job_index import JobIndex, job_matches
+from pagination import DEFAULT_LIMIT, MAX_LIMIT, decode_cursor, encode_cursor, page_bounds, parse_fields, project
+from storage import DEFAULT_DB_PATH, SQLiteRepository
+from auth import Busy, PasswordHasher, TokenSigner
+from locks import user_lock
+from status_pipeline import FIRST_CHECK_DELAY_S, StatusScheduler
+from cover_letters import DEFAULT_TONE, TEMPLATES, CoverLetterWriter
+from streaming import stream_response, wants_sse
+import resume_parser
+from resume_parser import SKILLS_POOL, ResumeTooLarge, parse_resume_bytes
+from scoring import MatchEngine, rank
+from records import SKILLS, to_records
+import catalog_snapshot
+from concurrent.futures.process import BrokenProcessPool
+import metrics
+from metrics import MetricsMiddleware, section
+from responses import FastJSONResponse, etag_response
+from compression import CompressionMiddleware
+import providers
+from providers import HTTPX_AVAILABLE, AdzunaProvider, FixtureProvider, Throttle, TTLCache
+from contextlib import asynccontextmanager
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(startup)
+    if STATUS_SCHEDULER:
+        SCHEDULER.start()
+    yield
+    if SCHEDULER:
+        await SCHEDULER.stop()
+    await providers.close_client()
+    resume_parser.shutdown_pool()
+    HASHER.shutdown()
 
 app = FastAPI(title="ApplyAI — Job Automation API", version="2.0.0",
-              description="Production-ready job application automation for Indian job market")
+              description="Production-ready job application automation for Indian job market",
+              lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,12 +56,85 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ── Instrumentation: per-route metrics at /metrics; PROFILE_SLOW_MS>0 dumps profiles of slow requests ──
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+PROFILE_DIR     = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+# Responses of at least this many bytes are gzip/brotli-compressed when the client accepts it
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESS_MIN_BYTES)
+app.add_middleware(MetricsMiddleware, routes=app.routes, slow_ms=PROFILE_SLOW_MS, profile_dir=PROFILE_DIR)
+
 # ── Config (set these env vars for real Adzuna data) ──
 ADZUNA_APP_ID  = os.getenv("ADZUNA_APP_ID", "")
 ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY", "")
+# Local Adzuna-shaped fixture (e.g. fixtures/adzuna_search.json) for offline runs and tests
+JOB_FIXTURE_FILE   = os.getenv("JOB_FIXTURE_FILE", "")
+PROVIDER_PAGES     = int(os.getenv("PROVIDER_PAGES", "1"))
+PROVIDER_BUDGET_S  = float(os.getenv("PROVIDER_BUDGET_S", "5.0"))
+PROVIDER_CACHE_TTL = float(os.getenv("PROVIDER_CACHE_TTL", "300"))
+# Shed calls may be answered from a cached result up to this much past its TTL
+PROVIDER_STALE_S   = float(os.getenv("PROVIDER_STALE_S", "3600"))
+# Upstream budget (calls/s, 0 = unlimited), globally and per caller (user_id, else client IP)
+PROVIDER_RATE_PER_S = float(os.getenv("PROVIDER_RATE_PER_S", "5"))
+PROVIDER_BURST      = float(os.getenv("PROVIDER_BURST", "10"))
+USER_RATE_PER_S     = float(os.getenv("USER_RATE_PER_S", "0.5"))
+USER_BURST          = float(os.getenv("USER_BURST", "5"))
+# Upstream calls in flight per provider, and how many more may queue before calls are shed
+PROVIDER_CONCURRENCY = int(os.getenv("PROVIDER_CONCURRENCY", "8"))
+PROVIDER_QUEUE       = int(os.getenv("PROVIDER_QUEUE", "32"))
+# e.g. a local mock (benchmarks/mock_adzuna.py) for testing against an Adzuna-shaped server
+ADZUNA_BASE_URL = os.getenv("ADZUNA_BASE_URL", providers.ADZUNA_BASE_URL)
+
+def build_providers() -> list:
+    def upstream():
+        return dict(cache=TTLCache(ttl=PROVIDER_CACHE_TTL, stale=PROVIDER_STALE_S),
+                    throttle=Throttle(PROVIDER_RATE_PER_S, PROVIDER_BURST, USER_RATE_PER_S, USER_BURST,
+                                      concurrency=PROVIDER_CONCURRENCY, queue=PROVIDER_QUEUE))
+    found = []
+    if ADZUNA_APP_ID and ADZUNA_APP_KEY and HTTPX_AVAILABLE:
+        found.append(AdzunaProvider(ADZUNA_APP_ID, ADZUNA_APP_KEY, base_url=ADZUNA_BASE_URL, **upstream()))
+    if JOB_FIXTURE_FILE:
+        found.append(FixtureProvider(JOB_FIXTURE_FILE, **upstream()))
+    return found
+
+PROVIDERS = build_providers()
+
+# ── Resume uploads ──
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(5 * 1024 * 1024)))
+RESUME_WORKERS   = int(os.getenv("RESUME_WORKERS", "2"))
+UPLOAD_CHUNK     = 64 * 1024
+MULTIPART_OVERHEAD = 64 * 1024  # boundary and part headers allowed on top of the file itself
+
+# Per-user match scores cached for this many users (one uint8 per catalog job each)
+MATCH_CACHE_SIZE = int(os.getenv("MATCH_CACHE_SIZE", "256"))
+
+# ── Storage (SQLite file shared by all workers; ":memory:" for throwaway runs) ──
+DB_PATH      = os.getenv("APPLYAI_DB", DEFAULT_DB_PATH)
+DB_POOL_SIZE = int(os.getenv("APPLYAI_DB_POOL", "4"))
+MAX_BULK_APPLY = 10_000
+# Prebuilt catalog + indexes, memory-mapped at startup ("" disables; off for :memory:)
+CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT", "" if DB_PATH == ":memory:" else DB_PATH + ".catalog")
+
+# Finished cover letters kept in memory (LRU over tone/job/company/skills/experience/name)
+COVER_LETTER_CACHE_SIZE = int(os.getenv("COVER_LETTER_CACHE_SIZE", "4096"))
+WRITER = CoverLetterWriter(COVER_LETTER_CACHE_SIZE)
+
+# ── Application status pipeline (background transitions; off = statuses stay put) ──
+STATUS_SCHEDULER = os.getenv("STATUS_SCHEDULER", "1") != "0"
+STATUS_TICK_S    = float(os.getenv("STATUS_TICK_S", "5"))
 
-# ── In-Memory DB ──
-DB = {"users": {}, "jobs": [], "applications": {}, "profiles": {}}
+# ── Auth ──
+# With AUTH_REQUIRED=1 every user-scoped call needs a bearer token. Without it, calls
+# without a token are still served (demo mode), but a token that is sent must be valid.
+AUTH_REQUIRED    = os.getenv("AUTH_REQUIRED", "0") == "1"
+AUTH_SECRET      = os.getenv("AUTH_SECRET", "")  # default: a random key stored in the database
+AUTH_TOKEN_TTL_S = float(os.getenv("AUTH_TOKEN_TTL_S", str(7 * 86400)))
+AUTH_TOKEN_CACHE = int(os.getenv("AUTH_TOKEN_CACHE", "10000"))
+# scrypt threads (half the cores, so searches keep the rest) and how many hashes may queue
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+AUTH_HASH_QUEUE   = int(os.getenv("AUTH_HASH_QUEUE", "32"))
+AUTH_SCRYPT_N     = int(os.getenv("AUTH_SCRYPT_N", str(2 ** 15)))
+HASHER = PasswordHasher(AUTH_HASH_WORKERS, AUTH_HASH_QUEUE, n=AUTH_SCRYPT_N)
 
 # ── Helpers: Generate Real Portal URLs ──
 def naukri_url(title: str, location: str) -> str:
@@ -147,7 +251,81 @@ def build_jobs():
         })
     return jobs
 
-DB["jobs"] = build_jobs()
+def load_catalog(jobs: List[dict], version: Optional[str] = None):
+    """Install a job catalog (stored dicts or JobRecords) and rebuild its indexes.
+
+    `version` is the stored catalog version; catalogs from elsewhere get a fresh one.
+    """
+    global JOB_INDEX, MATCH_ENGINE, RESUME_VOCAB
+    jobs = to_records(jobs)
+    JOB_INDEX = JobIndex(jobs)
+    MATCH_ENGINE = MatchEngine(jobs, cache_size=MATCH_CACHE_SIZE)
+    # (version, skills, titles): resume pool workers receive it once, when they start
+    skills = list(dict.fromkeys(SKILLS_POOL + SKILLS.names))
+    titles = list(dict.fromkeys(j.title for j in jobs))
+    RESUME_VOCAB = (version or uuid.uuid4().hex, tuple(skills), tuple(titles))
+
+def install_snapshot(snap, version: str) -> bool:
+    """Install a catalog loaded by catalog_snapshot; False if its skill ids clash with ours."""
+    global JOB_INDEX, MATCH_ENGINE, RESUME_VOCAB
+    skills, index, engine, vocab = snap
+    if not SKILLS.restore(skills):
+        return False
+    JOB_INDEX, MATCH_ENGINE = index, engine
+    RESUME_VOCAB = (version, *vocab[1:])
+    return True
+
+# ── Startup: storage and catalog load in the lifespan, not at import ──
+REPO: Optional[SQLiteRepository] = None
+JOB_INDEX = MATCH_ENGINE = RESUME_VOCAB = None
+SCHEDULER: Optional[StatusScheduler] = None
+TOKENS: Optional[TokenSigner] = None
+_startup_lock = threading.Lock()
+
+def startup():
+    """Open and migrate the database, then install the catalog. Idempotent.
+
+    The catalog comes from CATALOG_SNAPSHOT when it matches the stored
+    catalog version; otherwise it is built from the jobs table and the
+    snapshot is rewritten for the next worker or restart.
+    """
+    global REPO, SCHEDULER, TOKENS
+    with _startup_lock:
+        if REPO is not None:
+            return
+        repo = SQLiteRepository(DB_PATH, pool_size=DB_POOL_SIZE)
+        repo.migrate(seed_jobs=build_jobs)
+        version = repo.catalog_version()
+        snap = catalog_snapshot.load(CATALOG_SNAPSHOT, version) if CATALOG_SNAPSHOT else None
+        if snap is None or not install_snapshot(snap, version):
+            load_catalog(repo.load_jobs(), version)
+            if CATALOG_SNAPSHOT:
+                try:
+                    catalog_snapshot.save(CATALOG_SNAPSHOT, version,
+                                          (SKILLS.names, JOB_INDEX, MATCH_ENGINE, RESUME_VOCAB))
+                except OSError:
+                    pass  # read-only deploy dir: the snapshot is only an optimization
+        SCHEDULER = StatusScheduler(repo, interval=STATUS_TICK_S)
+        TOKENS = TokenSigner((AUTH_SECRET or repo.auth_secret()).encode(),
+                             ttl=AUTH_TOKEN_TTL_S, cache_size=AUTH_TOKEN_CACHE)
+        REPO = repo
+
+def paged(keys, cursor: Optional[str], limit: int):
+    try:
+        return page_bounds(keys, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+def seq_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        key = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if not isinstance(key, int):
+        raise HTTPException(400, "Invalid cursor")
+    return key
 
 # ── Pydantic Models ──
 class UserRegister(BaseModel):
@@ -164,126 +342,318 @@ class Profile(BaseModel):
 class ApplyRequest(BaseModel):
     user_id: str; job_ids: List[str]
 
+class BulkApplyRequest(BaseModel):
+    user_id: str; job_ids: List[str] = Field(..., max_length=MAX_BULK_APPLY)
+
+def default_if_blank(cls, value, info):
+    """Template fields sent as null or "" take the field's default instead of reaching render()."""
+    return cls.model_fields[info.field_name].default if value is None or value == "" else value
+
 class CoverLetterRequest(BaseModel):
-    job_title: str; company: str; skills: List[str]; experience: str; name: Optional[str] = "Applicant"
+    job_title: str; company: str; skills: List[str]; experience: str; name: str = "Applicant"
+    tone: str = DEFAULT_TONE
+    _blank = field_validator("name", "tone", mode="before")(classmethod(default_if_blank))
+
+class CoverLetterBatchRequest(BaseModel):
+    # Profile comes from the saved profile of user_id; explicit fields override it
+    job_ids: List[str] = Field(..., max_length=MAX_BULK_APPLY)
+    user_id: Optional[str] = None
+    name: Optional[str] = None; skills: Optional[List[str]] = None; experience: Optional[str] = None
+    tone: str = DEFAULT_TONE
+    _blank = field_validator("name", "experience", "tone", mode="before")(classmethod(default_if_blank))
 
 # ── Auth ──
+async def auth_user(authorization: Optional[str] = Header(None)) -> Optional[str]:
+    """User id of the request's bearer token; None if it sent none. Async, so no threadpool hop."""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    uid = TOKENS.verify(token.strip()) if scheme.lower() == "bearer" else None
+    if uid is None:
+        raise HTTPException(401, "Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
+    return uid
+
+def authorize(auth: Optional[str], user_id: Optional[str]):
+    """Allow acting as `user_id` only with that user's token (or none, unless AUTH_REQUIRED)."""
+    if user_id is None:
+        return
+    if auth is None:
+        if AUTH_REQUIRED:
+            raise HTTPException(401, "Missing token", headers={"WWW-Authenticate": "Bearer"})
+    elif auth != user_id:
+        raise HTTPException(403, "Token does not belong to this user")
+
+def session(uid: str, name: str, email: str) -> dict:
+    return {"success": True, "user_id": uid, "name": name, "email": email,
+            "token": TOKENS.issue(uid), "expires_in": int(AUTH_TOKEN_TTL_S)}
+
+async def hashing(call):
+    # scrypt runs on HASHER's threads; when its queue is full, shed the login instead of queueing it
+    try:
+        with section("auth.hash"):
+            return await call
+    except Busy:
+        raise HTTPException(503, "Too many logins in progress, retry shortly", headers={"Retry-After": "1"})
+
 @app.post("/api/auth/register")
-def register(data: UserRegister):
-    if data.email in DB["users"]:
+async def register(data: UserRegister):
+    # Storage calls go to a thread too: they can wait on the pool or on another writer's lock
+    if await asyncio.to_thread(REPO.get_user_by_email, data.email):
         raise HTTPException(400, "Email already exists")
     uid = str(uuid.uuid4())
-    DB["users"][data.email] = {"id": uid, "name": data.name, "email": data.email,
-                                "password": data.password, "created_at": str(datetime.datetime.now())}
-    DB["applications"][uid] = []
-    return {"success": True, "user_id": uid, "name": data.name, "email": data.email, "token": f"tok_{uid}"}
+    user = {"id": uid, "name": data.name, "email": data.email,
+            "password": await hashing(HASHER.hash(data.password)), "created_at": str(datetime.datetime.now())}
+    if not await asyncio.to_thread(REPO.create_user, user):
+        raise HTTPException(400, "Email already exists")
+    return session(uid, data.name, data.email)
 
 @app.post("/api/auth/login")
-def login(data: UserLogin):
+async def login(data: UserLogin):
     # Demo account
     if data.email == "demo@test.com" and data.password == "demo123":
-        uid = "demo-user-001"
-        if uid not in DB["applications"]:
-            DB["applications"][uid] = []
-        return {"success": True, "user_id": uid, "name": "Demo User", "email": data.email, "token": f"tok_{uid}"}
-    user = DB["users"].get(data.email)
-    if not user or user["password"] != data.password:
+        return session("demo-user-001", "Demo User", data.email)
+    user = await asyncio.to_thread(REPO.get_user_by_email, data.email)
+    # Unknown emails are checked against a decoy hash so they take as long as wrong passwords
+    ok, rehash = await hashing(HASHER.verify(data.password, user["password"] if user else None))
+    if not ok:
         raise HTTPException(401, "Invalid credentials")
-    return {"success": True, "user_id": user["id"], "name": user["name"], "email": user["email"], "token": f"tok_{user['id']}"}
+    if rehash:  # plaintext row from before hashing, or older scrypt parameters
+        await asyncio.to_thread(REPO.set_password, user["id"], await hashing(HASHER.hash(data.password)))
+    return session(user["id"], user["name"], user["email"])
 
 # ── Resume Parse ──
-@app.post("/api/resume/parse")
-async def parse_resume(file: UploadFile = File(...)):
-    content = await file.read()
-    # Try to extract text if PDF
-    text = ""
+async def read_upload(request: Request, field: str, limit: int) -> Tuple[str, bytes]:
+    """(filename, bytes) of one multipart file field, bounded before the form is parsed.
+
+    Declaring an UploadFile parameter would let Starlette spool the whole body
+    first, so the request is checked against Content-Length and, for chunked
+    bodies, counted as it arrives.
+    """
+    too_large = HTTPException(413, f"Resume exceeds {RESUME_MAX_BYTES // 1024}KB limit")
+    body_limit = limit + MULTIPART_OVERHEAD
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > body_limit:
+        raise too_large
+    received = 0
+
+    async def receive():
+        nonlocal received
+        message = await request.receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > body_limit:
+                raise too_large
+        return message
+
+    form = await Request(request.scope, receive).form(max_files=1, max_fields=8)
     try:
-        if file.filename.endswith(".pdf"):
-            # Simple byte extraction (no PyMuPDF needed for demo)
-            text = content.decode("latin-1", errors="ignore")
-    except Exception:
-        pass
-
-    skills_pool = ["React","JavaScript","Python","Node.js","TypeScript","AWS","Docker",
-                   "MongoDB","PostgreSQL","Java","Spring Boot","CSS","HTML","Git","MySQL",
-                   "Kubernetes","Redis","FastAPI","Django","TensorFlow","Flutter","Kotlin"]
-    extracted = {
-        "name": "Your Name",
-        "email": "your@email.com",
-        "phone": "+91 9876543210",
-        "experience": "3 years",
-        "skills": random.sample(skills_pool, 7),
-        "job_titles": ["Software Engineer","Full Stack Developer"],
-        "education": "B.Tech Computer Science",
-        "summary": f"Resume '{file.filename}' uploaded — {len(content)//1024 or 1}KB parsed. Update your profile with the correct details."
-    }
+        file = form.get(field)
+        if not isinstance(file, StarletteUploadFile):
+            raise HTTPException(422, f"Expected a file in the '{field}' field")
+        content = bytearray()
+        while chunk := await file.read(UPLOAD_CHUNK):
+            content += chunk
+            if len(content) > limit:
+                raise too_large
+        return file.filename, bytes(content)
+    finally:
+        await form.close()
+
+@app.post("/api/resume/parse")
+async def parse_resume(request: Request):
+    filename, content = await read_upload(request, "file", RESUME_MAX_BYTES)
+
+    # Extraction + skill matching are CPU-bound: keep them off the event loop
+    # Only the version key travels with each upload; workers got the vocabulary at start
+    vocab = RESUME_VOCAB
+    with section("resume.parse"):
+        try:
+            extracted = await resume_parser.run_in_pool(RESUME_WORKERS, vocab, parse_resume_bytes,
+                                                        filename, content, vocab[0])
+        except ResumeTooLarge as e:
+            raise HTTPException(413, str(e))
+        except BrokenProcessPool:  # the worker died twice on this file
+            raise HTTPException(422, "Resume could not be parsed")
+    chars = extracted.pop("chars")
+    extracted["summary"] = (f"Resume '{filename}' uploaded — {len(content)//1024 or 1}KB parsed, "
+                            f"{chars} characters of text. Review the extracted details and update your profile.")
     return {"success": True, "data": extracted}
 
 # ── Profile ──
 @app.post("/api/profile/save")
-def save_profile(profile: Profile):
-    DB["profiles"][profile.user_id] = profile.model_dump()
+def save_profile(profile: Profile, auth: Optional[str] = Depends(auth_user)):
+    authorize(auth, profile.user_id)
+    REPO.save_profile(profile.user_id, profile.model_dump())
     return {"success": True, "message": "Profile saved"}
 
 @app.get("/api/profile/{user_id}")
-def get_profile(user_id: str):
-    p = DB["profiles"].get(user_id)
+def get_profile(user_id: str, auth: Optional[str] = Depends(auth_user)):
+    authorize(auth, user_id)
+    p = REPO.get_profile(user_id)
     if not p:
         raise HTTPException(404, "Profile not found")
     return p
 
 # ── Jobs ──
 @app.get("/api/jobs")
-async def get_jobs(q: str = "", skills: str = "", location: str = "All",
-                   portal: str = "All", min_match: int = 0):
-    jobs = list(DB["jobs"])
-
-    # If Adzuna configured, try to fetch real jobs
-    if ADZUNA_APP_ID and ADZUNA_APP_KEY and HTTPX_AVAILABLE and q:
-        try:
-            params = {"app_id": ADZUNA_APP_ID, "app_key": ADZUNA_APP_KEY,
-                      "results_per_page": 20, "what": q or "software engineer",
-                      "where": location if location != "All" else "India",
-                      "content-type": "application/json"}
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                r = await client.get("https://api.adzuna.com/v1/api/jobs/in/search/1", params=params)
-                if r.status_code == 200:
-                    data = r.json()
-                    live = []
-                    for j in data.get("results", []):
-                        live.append({
-                            "id": j.get("id", str(uuid.uuid4())),
-                            "title": j.get("title",""),
-                            "company": j.get("company",{}).get("display_name","Unknown"),
-                            "location": j.get("location",{}).get("display_name","India"),
-                            "salary": f"₹{int(j.get('salary_min',0)/100000) or '—'}-{int(j.get('salary_max',0)/100000) or '—'} LPA",
-                            "portal": "Indeed/Adzuna",
-                            "skills": [],
-                            "experience": "",
-                            "posted": j.get("created",""),
-                            "match": random.randint(65, 95),
-                            "url": j.get("redirect_url",""),
-                            "apply_url": j.get("redirect_url",""),
-                            "description": j.get("description","")[:200],
-                        })
-                    jobs = live + jobs[:10]
-        except Exception:
-            pass  # Fall back to demo jobs
-
-    # Filter
-    if skills:
-        sl = [s.strip().lower() for s in skills.split(",")]
-        jobs = [j for j in jobs if any(s in [sk.lower() for sk in j.get("skills",[])] for s in sl)]
-    if location and location != "All":
-        jobs = [j for j in jobs if location.lower() in j["location"].lower() or j["location"] in ("Remote","Pan India")]
-    if portal and portal != "All":
-        jobs = [j for j in jobs if j["portal"] == portal]
-    if q:
-        jobs = [j for j in jobs if q.lower() in j["title"].lower() or q.lower() in j["company"].lower()]
-    if min_match:
-        jobs = [j for j in jobs if j.get("match",0) >= min_match]
-
-    return {"jobs": jobs, "total": len(jobs)}
+async def get_jobs(request: Request, q: str = "", skills: str = "", location: str = "All",
+                   portal: str = "All", min_match: int = 0,
+                   limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                   cursor: Optional[str] = None, fields: str = "", user_id: Optional[str] = None,
+                   salary_min: Optional[float] = None, salary_max: Optional[float] = None,
+                   exp_min: Optional[float] = None, exp_max: Optional[float] = None,
+                   auth: Optional[str] = Depends(auth_user)):
+    authorize(auth, user_id)
+    live = None
+
+    # If live providers are configured, fan out to them (partial results on timeout,
+    # catalog only if every call was shed)
+    if PROVIDERS and q:
+        with section("jobs.providers"):
+            live, _ = await providers.aggregate(PROVIDERS, q, location if location != "All" else "India",
+                                                pages=PROVIDER_PAGES, budget=PROVIDER_BUDGET_S,
+                                                user=caller_key(request, auth))
+
+    # With a saved profile, the per-user match replaces the static score for min_match and ranking
+    profile = await asyncio.to_thread(REPO.get_profile, user_id) if user_id else None
+
+    # Filter — catalog via the index, live results (≤20) with the reference predicate
+    filters = dict(q=q, skills=skills, location=location, portal=portal,
+                   min_match=0 if profile else min_match,
+                   salary_min=salary_min, salary_max=salary_max, exp_min=exp_min, exp_max=exp_max)
+    with section("jobs.filter"):
+        positions = JOB_INDEX.search(**filters)
+        if live is not None:
+            live = [j for j in live if job_matches(j, **filters)]
+            positions = with_live(positions)
+
+    with section("jobs.rank"):
+        keys, order, match = await rank_off_loop(positions, live, user_id, profile, min_match)
+    start, end, next_cursor = paged(keys, cursor, limit)
+    with section("jobs.render"):
+        page = render_rows(order, match, live, parse_fields(fields), start, end)
+    with section("jobs.serialize"):
+        return etag_response(request, {"jobs": page, "total": len(keys),
+                                        "limit": limit, "next_cursor": next_cursor})
+
+@app.get("/api/jobs/stream")
+async def stream_jobs(request: Request, q: str = "", skills: str = "", location: str = "All",
+                      portal: str = "All", min_match: int = 0,
+                      limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                      fields: str = "", user_id: Optional[str] = None,
+                      salary_min: Optional[float] = None, salary_max: Optional[float] = None,
+                      exp_min: Optional[float] = None, exp_max: Optional[float] = None,
+                      format: Optional[str] = None, accept: Optional[str] = Header(None),
+                      auth: Optional[str] = Depends(auth_user)):
+    """Same filters as /api/jobs, streamed as NDJSON (default) or SSE.
+
+    Frames: one `jobs` frame with the top `limit` catalog matches, one `jobs`
+    frame per live provider as it returns, then a `summary` frame. As in
+    /api/jobs, a query that goes to live providers keeps only the first ten
+    catalog jobs, unless no provider answers; the rest of the catalog then
+    follows in a second catalog frame.
+    """
+    authorize(auth, user_id)
+    try:
+        sse = wants_sse(format, accept)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    start = time.perf_counter()
+    elapsed = lambda: round((time.perf_counter() - start) * 1000, 2)
+    profile = await asyncio.to_thread(REPO.get_profile, user_id) if user_id else None
+    filters = dict(q=q, skills=skills, location=location, portal=portal,
+                   min_match=0 if profile else min_match,
+                   salary_min=salary_min, salary_max=salary_max, exp_min=exp_min, exp_max=exp_max)
+    wanted = parse_fields(fields)
+    caller = caller_key(request, auth)
+
+    async def frames():
+        positions = JOB_INDEX.search(**filters)
+        use_live = bool(PROVIDERS and q)
+        first = with_live(positions) if use_live else positions
+        keys, order, match = await rank_off_loop(first, None, user_id, profile, min_match)
+        sent = min(limit, len(keys))
+        yield "jobs", {"source": "catalog", "jobs": render_rows(order, match, None, wanted, 0, sent),
+                       "elapsed_ms": elapsed()}
+        sources = {"catalog": len(keys)}
+        reports = []
+        if use_live:
+            where = location if location != "All" else "India"
+            async for rows, report in providers.stream(PROVIDERS, q, where, pages=PROVIDER_PAGES,
+                                                       budget=PROVIDER_BUDGET_S, user=caller):
+                live = [j for j in rows if job_matches(j, **filters)]
+                _, order, match = await rank_off_loop(range(0), live, user_id, profile, min_match)
+                jobs = render_rows(order, match, live, wanted, 0, len(order))
+                sources[report["provider"]] = len(jobs)
+                reports.append(report)
+                yield "jobs", {"source": report["provider"], "jobs": jobs, "elapsed_ms": elapsed()}
+            if not any(r["pages_ok"] for r in reports):  # /api/jobs falls back to the whole catalog here
+                rest = positions[len(first):]
+                keys, order, match = await rank_off_loop(rest, None, user_id, profile, min_match)
+                sources["catalog"] += len(keys)
+                yield "jobs", {"source": "catalog", "elapsed_ms": elapsed(),
+                               "jobs": render_rows(order, match, None, wanted, 0, min(limit - sent, len(keys)))}
+        yield "summary", {"total": sum(sources.values()), "sources": sources,
+                          "providers": reports, "elapsed_ms": elapsed()}
+
+    return stream_response(frames(), sse)
+
+def with_live(positions):
+    """The catalog part kept next to live results: its first ten jobs."""
+    return positions[:bisect_left(positions, 10)]
+
+def caller_key(request: Request, auth: Optional[str]) -> str:
+    """Who an upstream call is billed to: the token's user, else the client address.
+
+    Never the `user_id` parameter: anyone can send a fresh one per request.
+    """
+    return auth or (request.client.host if request.client else "anonymous")
+
+def rank_results(positions, live, user_id: Optional[str], profile: Optional[dict], min_match: int):
+    """Result order as positions (live rows are -n..-1), keyset keys and per-user scores (or None)."""
+    if profile:
+        cand = (np.arange(positions.start, positions.stop) if isinstance(positions, range)
+                else np.asarray(positions, dtype=np.int64))
+        scores = MATCH_ENGINE.scores_for(user_id, profile)[cand]
+        if live:
+            cand = np.concatenate([np.arange(-len(live), 0), cand])
+            scores = np.concatenate([MatchEngine(live).score(profile), scores])
+        keys = rank(cand, scores, min_match)
+        return keys, keys.positions, keys.scores
+    if live is not None:
+        keys = list(range(-len(live), 0)) + list(positions)
+        return keys, keys, None
+    return positions, positions, None
+
+async def rank_off_loop(positions, live, user_id: Optional[str], profile: Optional[dict], min_match: int):
+    """rank_results; per-user scoring and sorting is NumPy work, so with a profile it runs on a thread."""
+    if profile:
+        return await asyncio.to_thread(rank_results, positions, live, user_id, profile, min_match)
+    return rank_results(positions, live, user_id, profile, min_match)
+
+def render_rows(order, match, live, wanted: Optional[tuple], start: int, end: int) -> List[dict]:
+    """Records render their display strings here, and only for the projected fields."""
+    catalog = JOB_INDEX.jobs
+    page = []
+    for i in range(start, end):
+        k = int(order[i])
+        job = (live[k] if k < 0 else catalog[k]).to_dict(wanted)
+        if match is not None and "match" in job:
+            job["match"] = int(match[i])
+        page.append(job)
+    return page
+
+@app.get("/api/applications/{user_id}/{application_id}/events")
+def get_application_events(user_id: str, application_id: str, auth: Optional[str] = Depends(auth_user)):
+    authorize(auth, user_id)
+    events = REPO.application_events(user_id, application_id)
+    if not events:
+        raise HTTPException(404, "Application not found")
+    return {"application_id": application_id, "events": events, "status": events[-1]["status"]}
+
+@app.get("/api/providers")
+def provider_metrics():
+    return {"providers": providers.metrics(PROVIDERS)}
 
 # ── Portal Deep Links ──
 @app.get("/api/portals/links")
@@ -297,77 +667,135 @@ def portal_links(q: str = "Software Engineer", location: str = "Bangalore"):
     }
 
 # ── Auto Apply ──
+def apply_to_jobs(user_id: str, job_ids: List[str]):
+    """Record applications for `job_ids` in one batch.
+
+    Returns (new records, per-id outcome) where the outcome is "applied",
+    "duplicate" (already applied, or repeated in this batch) or "not_found".
+    """
+    with user_lock(user_id):
+        return _apply_to_jobs(user_id, job_ids)
+
+def _apply_to_jobs(user_id: str, job_ids: List[str]):
+    with section("apply.lookup"):
+        seen = REPO.applied_job_ids(user_id, set(job_ids))
+    applied_at = str(datetime.datetime.now())
+    batch = uuid.uuid4().hex  # one uuid per batch; records get batch-seq ids
+    records, outcomes = [], {}
+    for job_id in job_ids:
+        if job_id in seen:
+            outcomes.setdefault(job_id, "duplicate")
+            continue
+        job = JOB_INDEX.get(job_id)
+        if job is None:
+            outcomes[job_id] = "not_found"
+            continue
+        seen.add(job_id)
+        outcomes[job_id] = "applied"
+        records.append({
+            "id": f"{batch}-{len(records)}", "job_id": job_id,
+            "title": job.title, "company": job.company,
+            "portal": job.portal, "salary": job.salary,
+            "location": job.location, "status": "Applied",
+            "applied_at": applied_at,
+            "match": job.match, "url": job.url,
+        })
+    with section("apply.insert"):
+        inserted = REPO.add_applications(user_id, records, next_status_at=time.time() + FIRST_CHECK_DELAY_S)
+    if len(inserted) != len(records):  # lost a race with a concurrent apply
+        kept = {r["job_id"] for r in inserted}
+        outcomes.update({r["job_id"]: "duplicate" for r in records if r["job_id"] not in kept})
+    return inserted, outcomes
+
 @app.post("/api/apply")
-def auto_apply(req: ApplyRequest):
-    if req.user_id not in DB["applications"]:
-        DB["applications"][req.user_id] = []
-    applied = []
-    for job_id in req.job_ids:
-        job = next((j for j in DB["jobs"] if j["id"] == job_id), None)
-        if job:
-            rec = {
-                "id": str(uuid.uuid4()), "job_id": job_id,
-                "title": job["title"], "company": job["company"],
-                "portal": job["portal"], "salary": job["salary"],
-                "location": job["location"], "status": "Applied",
-                "applied_at": str(datetime.datetime.now()),
-                "match": job["match"], "url": job.get("url",""),
-            }
-            DB["applications"][req.user_id].append(rec)
-            applied.append(rec)
-    return {"success": True, "applied_count": len(applied), "applications": applied}
+def auto_apply(req: ApplyRequest, auth: Optional[str] = Depends(auth_user)):
+    authorize(auth, req.user_id)
+    applied, _ = apply_to_jobs(req.user_id, req.job_ids)
+    return FastJSONResponse({"success": True, "applied_count": len(applied), "applications": applied})
+
+@app.post("/api/apply/bulk")
+def bulk_apply(req: BulkApplyRequest, auth: Optional[str] = Depends(auth_user)):
+    authorize(auth, req.user_id)
+    applied, outcomes = apply_to_jobs(req.user_id, req.job_ids)
+    counts = {"applied": 0, "duplicate": 0, "not_found": 0}
+    for o in outcomes.values():
+        counts[o] += 1
+    return FastJSONResponse({"success": True, **counts, "results": outcomes})
 
 # ── Applications ──
 @app.get("/api/applications/{user_id}")
-def get_applications(user_id: str):
-    apps = list(DB["applications"].get(user_id, []))
-    statuses = ["Applied","Applied","Applied","Applied","Viewed by Recruiter","Interview Scheduled","Shortlisted"]
-    for a in apps:
-        try:
-            elapsed = (datetime.datetime.now() - datetime.datetime.fromisoformat(a["applied_at"])).seconds
-            if elapsed > 30:
-                a["status"] = random.choice(statuses)
-        except Exception:
-            pass
-    return {"applications": apps, "total": len(apps)}
+def get_applications(user_id: str, limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                     cursor: Optional[str] = None, fields: str = "",
+                     order: str = Query("asc", pattern="^(asc|desc)$"), auth: Optional[str] = Depends(auth_user)):
+    authorize(auth, user_id)
+    # Keyset over the insertion sequence (order=desc: newest first); fetch one extra row to detect a next page
+    with section("applications.query"):
+        rows = REPO.list_applications(user_id, after=seq_cursor(cursor), limit=limit + 1,
+                                      newest_first=order == "desc")
+    next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+    apps = [a for _, a in rows[:limit]]
+    return FastJSONResponse({"applications": project(apps, parse_fields(fields)),
+                             "total": REPO.count_applications(user_id), "limit": limit, "next_cursor": next_cursor})
 
 # ── Cover Letter ──
+def check_tone(tone: str):
+    if tone not in TEMPLATES:
+        raise HTTPException(400, f"Unknown tone '{tone}'; choose from {', '.join(TEMPLATES)}")
+
 @app.post("/api/cover-letter")
 def generate_cover_letter(req: CoverLetterRequest):
-    skills_str = ", ".join(req.skills[:4])
-    primary_skill = req.skills[0] if req.skills else "software development"
-    letter = f"""Dear Hiring Manager at {req.company},
-
-I am writing to express my strong interest in the {req.job_title} position at {req.company}. With {req.experience} of hands-on industry experience specializing in {skills_str}, I am excited by the opportunity to contribute to your team.
-
-In my previous roles, I have successfully built and scaled production-grade systems using {primary_skill}, delivering measurable improvements in performance, reliability, and user experience. I am particularly drawn to {req.company} because of its reputation for technical excellence, fast-paced innovation culture, and the meaningful impact its products create for millions of users.
-
-Key highlights I would bring to this role:
-• Deep expertise in {skills_str}
-• Track record of delivering scalable solutions in agile environments
-• Strong collaboration with cross-functional teams and stakeholders
-• Passion for writing clean, well-tested, maintainable code
-
-I am confident that my background aligns strongly with what you're looking for, and I would welcome the chance to discuss how I can contribute to {req.company}'s engineering goals.
-
-Thank you for your time and consideration.
-
-Warm regards,
-{req.name}"""
-    return {"cover_letter": letter}
+    check_tone(req.tone)
+    return {"cover_letter": WRITER.letter(req.job_title, req.company, req.skills, req.experience, req.name, req.tone)}
+
+@app.post("/api/cover-letter/batch")
+def generate_cover_letters(req: CoverLetterBatchRequest, format: Optional[str] = None,
+                           accept: Optional[str] = Header(None), auth: Optional[str] = Depends(auth_user)):
+    """One letter per job id, streamed as NDJSON (default) or SSE as each is written."""
+    authorize(auth, req.user_id)
+    check_tone(req.tone)
+    try:
+        sse = wants_sse(format, accept)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    profile = (REPO.get_profile(req.user_id) if req.user_id else None) or {}
+    name = req.name or profile.get("name") or "Applicant"
+    experience = req.experience or profile.get("experience") or "3 years"
+    skills = req.skills if req.skills is not None else profile.get("skills", [])
+
+    def frames():
+        start, written, missing = time.perf_counter(), 0, 0
+        for job_id in dict.fromkeys(req.job_ids):
+            job = JOB_INDEX.get(job_id)
+            if job is None:
+                missing += 1
+                yield "error", {"job_id": job_id, "error": "not_found"}
+                continue
+            # Lead with the skills this job actually asks for
+            wanted = set(job.skills)
+            ordered = [s for s in skills if s in wanted] + [s for s in skills if s not in wanted]
+            letter = WRITER.letter(job.title, job.company, ordered, experience, name, req.tone)
+            written += 1
+            yield "letter", {"job_id": job_id, "title": job.title, "company": job.company, "cover_letter": letter}
+        yield "done", {"count": written, "not_found": missing, "tone": req.tone,
+                       "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+    return stream_response(frames(), sse)
 
 # ── Stats ──
 @app.get("/api/stats/{user_id}")
-def get_stats(user_id: str):
-    apps = DB["applications"].get(user_id, [])
+def get_stats(user_id: str, auth: Optional[str] = Depends(auth_user)):
+    authorize(auth, user_id)
     return {
-        "total_applied": len(apps),
-        "viewed": len([a for a in apps if "Viewed" in a.get("status","")]),
-        "interviews": len([a for a in apps if "Interview" in a.get("status","") or "Shortlisted" in a.get("status","")]),
+        **REPO.application_stats(user_id),
         "portals_connected": 4,
-        "jobs_found_today": len(DB["jobs"]),
+        "jobs_found_today": len(JOB_INDEX),
     }
 
+# ── Metrics (Prometheus text format; per worker process) ──
+@app.get("/metrics")
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # ── Serve Frontend Static Files ──
 FRONTEND_DIR = os.path.join(os.path.dirname(__file__), '..', 'frontend')
 if os.path.isdir(FRONTEND_DIR):
@@ -388,8 +816,16 @@ if __name__ == "__main__":
     print("🌐 Dashboard:  http://localhost:8000/")
     print("🗂️  Landing:    http://localhost:8000/landing")
     print("📋 API Docs:   http://localhost:8000/docs")
-    if ADZUNA_APP_ID:
-        print(f"✅ Adzuna API: Connected")
+    if PROVIDERS:
+        print(f"✅ Live providers: {', '.join(p.name for p in PROVIDERS)}")
     else:
         print("ℹ️  Using 50 demo jobs with real portal URLs")
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=False)
+    # Workers share state through the SQLite file, so APPLYAI_WORKERS > 1 is safe
+    # (except with APPLYAI_DB=:memory:, which is private to each process)
+    workers = int(os.getenv("APPLYAI_WORKERS", "1"))
+    if workers > 1:
+        print(f"🧵 Workers:    {workers}")
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000, reload=False)
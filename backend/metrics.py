@@ -0,0 +1,273 @@
+"""Request metrics, section timers and an opt-in sampling profiler.
+
+`MetricsMiddleware` is a plain ASGI middleware, so streamed responses pass
+through untouched. It records, per (method, route template), a latency
+histogram, request and response size histograms, a status counter and an
+in-flight gauge. Inside handlers, `with section("jobs.filter"):` adds a
+named timer. `render()` emits everything in the Prometheus text format for
+GET /metrics. Numbers are per process: with several uvicorn workers each one
+reports its own, so scrape them individually or sum them.
+
+With PROFILE_SLOW_MS set, a background thread samples every thread's stack
+while requests are in flight. When a request runs longer than the threshold,
+the samples taken during it are written to PROFILE_DIR as collapsed stacks
+(`frame;frame;frame count`). flamegraph.pl, speedscope and inferno all read
+this format. Concurrent requests share threads, so a dump can include frames
+from neighbouring requests.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.request_size: Dict[Tuple[str, str], Histogram] = {}
+        self.response_size: Dict[Tuple[str, str], Histogram] = {}
+        self.requests: Counter = Counter()  # (method, route, status)
+        self.in_flight: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.sections: Dict[str, Histogram] = {}
+
+    def begin(self, key: Tuple[str, str]):
+        with self._lock:
+            self.in_flight[key] += 1
+
+    def end(self, key: Tuple[str, str], status: int, seconds: float,
+            request_bytes: int, response_bytes: int):
+        with self._lock:
+            self.in_flight[key] -= 1
+            _hist(self.latency, key, LATENCY_BUCKETS).observe(seconds)
+            _hist(self.request_size, key, SIZE_BUCKETS).observe(request_bytes)
+            _hist(self.response_size, key, SIZE_BUCKETS).observe(response_bytes)
+            self.requests[(*key, status)] += 1
+
+    def observe_section(self, name: str, seconds: float):
+        with self._lock:
+            _hist(self.sections, name, LATENCY_BUCKETS).observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.__init__()
+
+
+def _hist(table: dict, key, bounds) -> Histogram:
+    h = table.get(key)
+    if h is None:
+        h = table[key] = Histogram(bounds)
+    return h
+
+
+REGISTRY = Registry()
+
+
+@contextmanager
+def section(name: str):
+    """Time a named block inside a handler (sync or async code)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe_section(name, time.perf_counter() - start)
+
+
+# ── Prometheus text format ──
+def _labels(**kv) -> str:
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in kv.items()) + "}"
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(name: str, table: dict, label_names: Sequence[str]):
+    for key, h in sorted(table.items()):
+        labels = dict(zip(label_names, key if isinstance(key, tuple) else (key,)))
+        running = 0
+        for bound, n in zip((*h.bounds, "+Inf"), h.counts):
+            running += n
+            yield f"{name}_bucket{_labels(**labels, le=bound)} {running}"
+        yield f"{name}_sum{_labels(**labels)} {h.sum:.6f}"
+        yield f"{name}_count{_labels(**labels)} {h.count}"
+
+
+def render(registry: Registry = REGISTRY) -> str:
+    with registry._lock:
+        out = []
+        for name, help_, table, labels in (
+            ("applyai_http_request_duration_seconds", "Request latency by route.",
+             registry.latency, ("method", "route")),
+            ("applyai_http_request_size_bytes", "Request body size by route.",
+             registry.request_size, ("method", "route")),
+            ("applyai_http_response_size_bytes", "Response body size by route.",
+             registry.response_size, ("method", "route")),
+            ("applyai_section_duration_seconds", "Named handler sections.",
+             registry.sections, ("section",)),
+        ):
+            out += [f"# HELP {name} {help_}", f"# TYPE {name} histogram"]
+            out += _histogram_lines(name, table, labels)
+        out += ["# HELP applyai_http_requests_total Requests by route and status.",
+                "# TYPE applyai_http_requests_total counter"]
+        out += [f"applyai_http_requests_total{_labels(method=m, route=r, status=s)} {n}"
+                for (m, r, s), n in sorted(registry.requests.items())]
+        out += ["# HELP applyai_http_requests_in_flight Requests currently being served.",
+                "# TYPE applyai_http_requests_in_flight gauge"]
+        out += [f"applyai_http_requests_in_flight{_labels(method=m, route=r)} {n}"
+                for (m, r), n in sorted(registry.in_flight.items())]
+    return "\n".join(out) + "\n"
+
+
+# ── Sampling profiler ──
+class SamplingProfiler:
+    """Samples all thread stacks every `interval` seconds while requests are in flight."""
+
+    def __init__(self, interval: float = 0.005, keep_seconds: float = 60.0):
+        self.interval = interval
+        self._samples: "deque[Tuple[float, str]]" = deque(maxlen=int(keep_seconds / interval))
+        self._active = 0
+        self._wake = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="applyai-profiler", daemon=True)
+            self._thread.start()
+
+    def enter(self):
+        with self._wake:
+            self._active += 1
+            self._wake.notify()
+
+    def exit(self):
+        with self._wake:
+            self._active -= 1
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._wake:
+                while not self._active:
+                    self._wake.wait()
+            now = time.perf_counter()
+            for tid, frame in sys._current_frames().items():
+                # skip ourselves and idle pool threads parked in Condition.wait / queue.get
+                if tid != me and os.path.basename(frame.f_code.co_filename) not in _IDLE_FILES:
+                    self._samples.append((now, _fold(frame)))
+            time.sleep(self.interval)
+
+    def collapsed(self, start: float, end: float) -> Dict[str, int]:
+        return Counter(stack for t, stack in list(self._samples) if start <= t <= end)
+
+
+_IDLE_FILES = ("threading.py", "thread.py", "queue.py")
+
+
+def _fold(frame) -> str:
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def dump_profile(stacks: Dict[str, int], directory: str, method: str, route: str, seconds: float) -> str:
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{method}-{slug}-{int(seconds * 1000)}ms.folded")
+    with open(path, "w") as f:
+        f.writelines(f"{stack} {n}\n" for stack, n in stacks.items())
+    return path
+
+
+# ── ASGI middleware ──
+def route_template(routes: Sequence, scope) -> str:
+    """The path template a request will be routed to (labels must not contain raw ids)."""
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path or "/"
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app, routes: Sequence, registry: Registry = REGISTRY,
+                 slow_ms: float = 0.0, profile_dir: str = "profiles"):
+        self.app = app
+        self.routes = routes
+        self.registry = registry
+        self.slow_s = slow_ms / 1000
+        self.profile_dir = profile_dir
+        self.profiler = SamplingProfiler() if slow_ms > 0 else None
+        if self.profiler:
+            self.profiler.start()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method = scope["method"]
+        key = (method, route_template(self.routes, scope))
+        self.registry.begin(key)
+        if self.profiler:
+            self.profiler.enter()
+        sizes = {"in": 0, "out": 0}
+        status = 500
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                sizes["in"] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sizes["out"] += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            end = time.perf_counter()
+            self.registry.end(key, status, end - start, sizes["in"], sizes["out"])
+            if self.profiler:
+                self.profiler.exit()
+                if end - start >= self.slow_s:
+                    stacks = self.profiler.collapsed(start, end)
+                    if stacks:
+                        dump_profile(stacks, self.profile_dir, method, key[1], end - start)
@@ -0,0 +1,60 @@
+"""Keyset pagination and field projection for list endpoints.
+
+Every list endpoint exposes its results as an ordered sequence of sort keys
+(catalog positions, insertion sequence numbers, ...). A cursor is the opaque,
+URL-safe encoding of the last key a client has seen; the next page starts at
+the first key strictly greater than it, so pages stay stable while new rows
+are appended.
+"""
+import base64
+import json
+from bisect import bisect_right
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def encode_cursor(key: Any) -> str:
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Any:
+    """Inverse of encode_cursor; raises ValueError on malformed input."""
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(cursor + pad))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    # JSON turns tuples into lists; keys are compared as tuples
+    return tuple(key) if isinstance(key, list) else key
+
+
+def page_bounds(keys: Sequence, cursor: Optional[str], limit: int) -> Tuple[int, int, Optional[str]]:
+    """Return (start, end, next_cursor) for one page over sorted `keys`.
+
+    `keys` only needs __len__/__getitem__, so a range or an index result can be
+    paged without materializing the records behind it.
+    """
+    try:
+        start = bisect_right(keys, decode_cursor(cursor)) if cursor else 0
+    except TypeError as e:  # cursor from a differently-keyed endpoint
+        raise ValueError("Invalid cursor") from e
+    end = min(start + limit, len(keys))
+    next_cursor = encode_cursor(keys[end - 1]) if end < len(keys) else None
+    return start, end, next_cursor
+
+
+def parse_fields(fields: str) -> Optional[Tuple[str, ...]]:
+    """Parse a `fields=a,b,c` projection; `id` is always kept for cursoring."""
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    return tuple(dict.fromkeys(["id", *names]))
+
+
+def project(records: Iterable[dict], fields: Optional[Tuple[str, ...]]) -> list:
+    if fields is None:
+        return list(records)
+    return [{f: r[f] for f in fields if f in r} for r in records]
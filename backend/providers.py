@@ -0,0 +1,431 @@
+"""Pluggable live job sources for /api/jobs.
+
+Each provider returns JobRecords for one (what, where, page) query.
+`aggregate` fans out over every provider and page concurrently, gives each
+provider its own deadline budget and returns whatever finished in time;
+`stream` does the same but yields each provider's rows as soon as it is done.
+Responses are cached per provider in a small TTL+LRU cache.
+
+In front of the upstream, each provider has:
+
+* single-flight: concurrent misses for the same query share one upstream call
+* a `Throttle`: token buckets for the global upstream budget and for each
+  caller, plus a bounded queue of waiting calls
+
+A call the throttle refuses raises `Shed`. The caller then gets the last
+cached answer if one is still within the stale window. Otherwise the page is
+reported as shed and the endpoint answers from the local catalog alone.
+"""
+import asyncio
+import importlib.util
+import json
+import random
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from records import NAN, JobRecord, parse_posted
+
+# Optional: httpx is only needed for live Adzuna calls, so it is imported on first use
+HTTPX_AVAILABLE = importlib.util.find_spec("httpx") is not None
+
+ADZUNA_BASE_URL = "https://api.adzuna.com"
+ADZUNA_SEARCH_PATH = "/v1/api/jobs/in/search/{page}"
+_MISSING = object()
+
+
+# ── Cache ──
+class TTLCache:
+    """LRU cache whose entries expire `ttl` seconds after insertion.
+
+    Expired entries are kept for another `stale` seconds, during which only
+    `get_stale` returns them (the answer for shed calls).
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0, stale: float = 0.0):
+        self.maxsize, self.ttl, self.stale = maxsize, ttl, stale
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def _lookup(self, key: Hashable, max_age: float) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return _MISSING
+        stored, value = item
+        age = time.monotonic() - stored
+        if age > self.ttl + self.stale:
+            del self._data[key]
+            return _MISSING
+        if age > max_age:
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        value = self._lookup(key, self.ttl)
+        return default if value is _MISSING else value
+
+    def get_stale(self, key: Hashable, default: Any = _MISSING) -> Any:
+        value = self._lookup(key, self.ttl + self.stale)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ── Admission control ──
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`."""
+
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate, self.burst = rate, max(float(burst), 1.0)
+        self.tokens, self.stamp = self.burst, time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def give(self):
+        self.tokens = min(self.burst, self.tokens + 1.0)
+
+
+class Shed(Exception):
+    """An upstream call refused by the throttle: 'user_rate', 'rate' or 'queue_full'."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Throttle:
+    """Admission control for one upstream.
+
+    `rate` is the global budget in calls per second and `user_rate` the
+    budget per caller key (0 disables either). Per-caller buckets are kept in
+    an LRU of `max_users`. `concurrency` calls run at once, up to `queue` more
+    wait for a slot, and anything beyond that is shed straight away.
+    """
+
+    def __init__(self, rate: float = 0.0, burst: float = 10, user_rate: float = 0.0, user_burst: float = 5,
+                 concurrency: int = 8, queue: int = 32, max_users: int = 10_000):
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.user_rate, self.user_burst, self.max_users = user_rate, user_burst, max_users
+        self._users: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.concurrency, self.queue = concurrency, queue
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.pending = self.active = 0  # admitted calls not yet finished / of those, holding a slot
+
+    def admit(self, user: Optional[str]):
+        """Charge one upstream call to `user` and the global budget, or raise Shed.
+
+        An admitted call holds its queue place until `release`.
+        """
+        if self.pending >= self.concurrency + self.queue:
+            raise Shed("queue_full")
+        ub = self._user_bucket(user) if user and self.user_rate > 0 else None
+        if ub is not None and not ub.take():
+            raise Shed("user_rate")
+        if self.bucket is not None and not self.bucket.take():
+            if ub is not None:
+                ub.give()  # the call never happened, so don't bill the user for it
+            raise Shed("rate")
+        self.pending += 1
+
+    def release(self):
+        self.pending -= 1
+
+    def _user_bucket(self, user: str) -> TokenBucket:
+        b = self._users.get(user)
+        if b is None:
+            b = self._users[user] = TokenBucket(self.user_rate, self.user_burst)
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user)
+        return b
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        await self._slots.acquire()
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    def as_dict(self) -> dict:
+        return {"active": self.active, "waiting": self.pending - self.active, "concurrency": self.concurrency,
+                "queue": self.queue, "tracked_users": len(self._users)}
+
+
+# ── Shared HTTP client ──
+_client: Optional["httpx.AsyncClient"] = None
+
+def get_client() -> "httpx.AsyncClient":
+    """One pooled client per worker, so upstream connections are reused."""
+    global _client
+    if _client is None or _client.is_closed:
+        import httpx
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0, connect=2.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _client
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# ── Normalization ──
+def _lakhs(rupees) -> float:
+    return int((rupees or 0) / 100000) or NAN
+
+
+def adzuna_to_job(j: dict) -> JobRecord:
+    """Map one Adzuna search result onto a JobRecord."""
+    return JobRecord(
+        id=str(j.get("id") or uuid.uuid4()),
+        title=j.get("title",""),
+        company=j.get("company",{}).get("display_name","Unknown"),
+        location=j.get("location",{}).get("display_name","India"),
+        portal="Indeed/Adzuna",
+        skills=[],
+        salary_min=_lakhs(j.get("salary_min")), salary_max=_lakhs(j.get("salary_max")),
+        exp_min=NAN, exp_max=NAN,
+        posted_at=parse_posted(j.get("created","")),
+        match=random.randint(65, 95),
+        url=j.get("redirect_url",""),
+        description=j.get("description","")[:200],
+    )
+
+
+# ── Providers ──
+class ProviderStats:
+    def __init__(self):
+        self.requests = self.hits = self.misses = self.errors = self.timeouts = 0
+        self.coalesced = self.stale = self.fetched = 0
+        self.shed: Counter = Counter()
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def observe(self, seconds: float):
+        self.fetched += 1
+        self.latency_total += seconds
+        self.latency_max = max(self.latency_max, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests, "cache_hits": self.hits, "cache_misses": self.misses,
+            "coalesced": self.coalesced, "shed": dict(self.shed), "stale_served": self.stale,
+            "errors": self.errors, "timeouts": self.timeouts,
+            "avg_latency_ms": round(1000 * self.latency_total / self.fetched, 2) if self.fetched else None,
+            "max_latency_ms": round(1000 * self.latency_max, 2),
+        }
+
+
+class JobProvider(ABC):
+    """Base class: subclasses implement `fetch`; `search` adds caching, coalescing,
+    throttling and metrics."""
+    name = "base"
+
+    def __init__(self, cache: Optional[TTLCache] = None, throttle: Optional[Throttle] = None):
+        self.cache = cache if cache is not None else TTLCache()
+        self.throttle = throttle if throttle is not None else Throttle()
+        self.stats = ProviderStats()
+        self._inflight: Dict[Hashable, "asyncio.Future"] = {}
+
+    @abstractmethod
+    async def fetch(self, what: str, where: str, page: int) -> List[JobRecord]:
+        """One page of results straight from the upstream, uncached."""
+
+    async def search(self, what: str, where: str, page: int = 1, user: Optional[str] = None) -> List[JobRecord]:
+        """Rows for one query; `user` is the caller key billed by the per-user bucket."""
+        self.stats.requests += 1
+        key = (what.strip().lower(), where.strip().lower(), page)
+        cached = self.cache.get(key)
+        if cached is not _MISSING:
+            self.stats.hits += 1
+            return cached
+        call = self._inflight.get(key)
+        if call is not None:
+            self.stats.coalesced += 1
+        else:
+            try:
+                self.throttle.admit(user)
+            except Shed as e:
+                self.stats.shed[e.reason] += 1
+                stale = self.cache.get_stale(key)
+                if stale is not _MISSING:
+                    self.stats.stale += 1
+                    return stale
+                raise
+            self.stats.misses += 1
+            call = self._inflight[key] = asyncio.ensure_future(self._call(key, what, where, page))
+            call.add_done_callback(self._call_done)
+        # shield: a caller hitting its deadline must not cancel the call others are waiting on
+        try:
+            return await asyncio.shield(call)
+        except asyncio.CancelledError:
+            self.stats.timeouts += 1
+            raise
+
+    async def _call(self, key: Hashable, what: str, where: str, page: int) -> List[JobRecord]:
+        try:
+            async with self.throttle.slot():
+                start = time.perf_counter()
+                rows = await self.fetch(what, where, page)
+            self.stats.observe(time.perf_counter() - start)
+            self.cache.set(key, rows)
+            return rows
+        except Exception:
+            self.stats.errors += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _call_done(self, task: "asyncio.Future"):
+        self.throttle.release()
+        # Every caller may have given up on a shared call; read its error so asyncio doesn't log it
+        if not task.cancelled():
+            task.exception()
+
+
+class AdzunaProvider(JobProvider):
+    name = "adzuna"
+
+    def __init__(self, app_id: str, app_key: str, per_page: int = 20, cache: Optional[TTLCache] = None,
+                 throttle: Optional[Throttle] = None, base_url: str = ADZUNA_BASE_URL):
+        super().__init__(cache, throttle)
+        self.app_id, self.app_key, self.per_page = app_id, app_key, per_page
+        self.url = base_url.rstrip("/") + ADZUNA_SEARCH_PATH
+
+    async def fetch(self, what: str, where: str, page: int) -> List[JobRecord]:
+        params = {"app_id": self.app_id, "app_key": self.app_key,
+                  "results_per_page": self.per_page, "what": what or "software engineer",
+                  "where": where, "content-type": "application/json"}
+        r = await get_client().get(self.url.format(page=page), params=params)
+        r.raise_for_status()
+        return [adzuna_to_job(j) for j in r.json().get("results", [])]
+
+
+class FixtureProvider(JobProvider):
+    """Local stand-in for Adzuna that serves a saved search response from disk.
+
+    `delay` simulates upstream latency so deadlines can be exercised offline.
+    """
+    name = "fixture"
+
+    def __init__(self, path: str, per_page: int = 20, delay: float = 0.0, cache: Optional[TTLCache] = None,
+                 throttle: Optional[Throttle] = None):
+        super().__init__(cache, throttle)
+        self.path, self.per_page, self.delay = path, per_page, delay
+        self._results: Optional[List[dict]] = None
+
+    async def fetch(self, what: str, where: str, page: int) -> List[JobRecord]:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self._results is None:
+            with open(self.path, encoding="utf-8") as f:
+                self._results = json.load(f).get("results", [])
+        needle = what.lower()
+        hits = [j for j in self._results if needle in j.get("title", "").lower()]
+        lo = (page - 1) * self.per_page
+        return [adzuna_to_job(j) for j in hits[lo:lo + self.per_page]]
+
+
+# ── Fan-out ──
+async def _collect(provider: JobProvider, what: str, where: str, pages: int, budget: float,
+                   user: Optional[str] = None) -> Tuple[List[JobRecord], dict]:
+    start = time.perf_counter()
+    tasks = [asyncio.ensure_future(provider.search(what, where, p, user)) for p in range(1, pages + 1)]
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for t in pending:
+        t.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    rows: List[JobRecord] = []
+    ok = shed = 0
+    for t in tasks:  # keep page order
+        if t not in done:
+            continue
+        exc = t.exception()
+        if exc is None:
+            rows.extend(t.result())
+            ok += 1
+        elif isinstance(exc, Shed):
+            shed += 1
+    report = {"provider": provider.name, "pages_ok": ok, "pages_failed": len(done) - ok - shed,
+              "pages_shed": shed, "pages_timed_out": len(pending), "results": len(rows),
+              "elapsed_ms": round(1000 * (time.perf_counter() - start), 2)}
+    return rows, report
+
+
+async def aggregate(providers: Sequence[JobProvider], what: str, where: str, pages: int = 1,
+                    budget: float = 5.0, user: Optional[str] = None) -> Tuple[Optional[List[JobRecord]], List[dict]]:
+    """Query every provider/page concurrently within a per-provider `budget`.
+
+    Returns (rows, reports). `rows` is None when no page from any provider
+    succeeded (down, timed out or shed), so callers can tell that from "no
+    results" and answer from the local catalog.
+    """
+    results = await asyncio.gather(*(_collect(p, what, where, pages, budget, user) for p in providers))
+    rows: List[JobRecord] = []
+    seen = set()
+    any_ok = False
+    for provider_rows, report in results:
+        any_ok = any_ok or report["pages_ok"] > 0
+        for j in provider_rows:
+            if j.id not in seen:
+                seen.add(j.id)
+                rows.append(j)
+    return (rows if any_ok else None), [r for _, r in results]
+
+
+async def stream(providers: Sequence[JobProvider], what: str, where: str, pages: int = 1,
+                 budget: float = 5.0, user: Optional[str] = None) -> AsyncIterator[Tuple[List[JobRecord], dict]]:
+    """Like `aggregate`, but yields (rows, report) per provider as soon as it finishes.
+
+    Rows are de-duplicated across providers. Closing the generator early
+    cancels the providers still running.
+    """
+    tasks = [asyncio.ensure_future(_collect(p, what, where, pages, budget, user)) for p in providers]
+    seen = set()
+    try:
+        for fut in asyncio.as_completed(tasks):
+            rows, report = await fut
+            fresh = [j for j in rows if j.id not in seen]
+            seen.update(j.id for j in fresh)
+            yield fresh, report
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+def metrics(providers: Sequence[JobProvider]) -> Dict[str, dict]:
+    return {p.name: {**p.stats.as_dict(), "cache_size": len(p.cache), "in_flight": len(p._inflight),
+                     "throttle": p.throttle.as_dict()} for p in providers}
@@ -0,0 +1,177 @@
+"""Canonical job records.
+
+A `JobRecord` holds parsed, typed fields (numeric salary and experience
+ranges, a posted timestamp, skill ids) in `__slots__`. Repeated strings
+(title, company, location, portal) are interned and skills are ids into a
+process-wide table, so a large catalog shares one copy of each value. The
+display strings the API has always returned ("₹18-25 LPA", "3-6 yrs",
+"2 hours ago") are rendered only when a record is serialized.
+"""
+import math
+import re
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_NUM = re.compile(r"\d+(?:\.\d+)?")
+_AGO = re.compile(r"(\d+)\s+(minute|hour|day|week)s?\s+ago")
+_UNIT_SECONDS = {"minute": 60, "hour": 3600, "day": 86400, "week": 7 * 86400}
+TODAY_AGE = 6 * 3600  # posts from here up to a day old read "Today"; younger ones "N hours ago"
+NAN = float("nan")
+
+JOB_FIELDS = ("id", "title", "company", "location", "salary", "portal", "skills", "experience",
+              "posted", "match", "url", "apply_url", "description")
+
+
+def parse_range(text: str) -> Tuple[float, float]:
+    """'₹18-25 LPA' -> (18, 25), '3-6 yrs' -> (3, 6), '5+ years' -> (5, 5); NaNs if absent."""
+    nums = [float(n) for n in _NUM.findall(text or "")]
+    if not nums:
+        return NAN, NAN
+    return nums[0], nums[1] if len(nums) > 1 else nums[0]
+
+
+def parse_posted(text: str, now: Optional[float] = None) -> float:
+    """Turn '2 hours ago' / 'Yesterday' / an ISO timestamp into epoch seconds."""
+    now = time.time() if now is None else now
+    label = (text or "").strip().lower()
+    if label in ("", "just now"):
+        return now
+    if label == "today":
+        return now - TODAY_AGE
+    if label == "yesterday":
+        return now - 86400
+    m = _AGO.match(label)
+    if m:
+        return now - int(m.group(1)) * _UNIT_SECONDS[m.group(2)]
+    try:
+        from datetime import datetime
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return now
+
+
+def render_posted(posted_at: float, now: Optional[float] = None) -> str:
+    age = (time.time() if now is None else now) - posted_at
+    if age < 3600:
+        return "Just now"
+    if age < TODAY_AGE:
+        hours = int(age // 3600)
+        return f"{hours} hour{'s' if hours > 1 else ''} ago"
+    if age < 86400:
+        return "Today"
+    if age < 2 * 86400:
+        return "Yesterday"
+    return f"{int(age // 86400)} days ago"
+
+
+def pin_posted(job: dict, now: Optional[float] = None) -> dict:
+    """`job` with its 'posted' label ('2 hours ago', 'Today') stored as an absolute ISO time.
+
+    Relative labels are only meaningful against the moment they were read, so
+    stored jobs keep absolute times; otherwise every rebuild would reset them.
+    """
+    from datetime import datetime, timezone
+    posted_at = parse_posted(job.get("posted", ""), now)
+    return {**job, "posted": datetime.fromtimestamp(posted_at, timezone.utc).isoformat(timespec="seconds")}
+
+
+def _fmt(v: float) -> str:
+    return "—" if math.isnan(v) else f"{v:g}"
+
+
+class SkillTable:
+    """Process-wide skill name <-> id table."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def id(self, name: str) -> int:
+        i = self.ids.get(name)
+        if i is None:
+            i = self.ids[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return i
+
+    def restore(self, names: Sequence[str]) -> bool:
+        """Adopt a saved table (catalog snapshot). Only possible while ours is a
+        prefix of it, so ids already handed out keep their meaning."""
+        if list(names[:len(self.names)]) != self.names:
+            return False
+        for name in names[len(self.names):]:
+            self.id(name)
+        return True
+
+
+SKILLS = SkillTable()
+_NUMBERS: Dict[float, float] = {}  # share identical float objects across records
+
+
+def _num(v: float) -> float:
+    return v if math.isnan(v) else _NUMBERS.setdefault(v, v)
+
+
+class JobRecord:
+    __slots__ = ("id", "title", "company", "location", "portal", "skill_ids",
+                 "salary_min", "salary_max", "exp_min", "exp_max", "posted_at",
+                 "match", "url", "description")
+
+    def __init__(self, id: str, title: str, company: str, location: str, portal: str,
+                 skills: Iterable[str], salary_min: float, salary_max: float,
+                 exp_min: float, exp_max: float, posted_at: float, match: int,
+                 url: str, description: str):
+        self.id = id
+        self.title = sys.intern(title)
+        self.company = sys.intern(company)
+        self.location = sys.intern(location)
+        self.portal = sys.intern(portal)
+        self.skill_ids = tuple(SKILLS.id(s) for s in skills)
+        self.salary_min, self.salary_max = _num(salary_min), _num(salary_max)
+        self.exp_min, self.exp_max = _num(exp_min), _num(exp_max)
+        self.posted_at = posted_at
+        self.match = match
+        self.url = url
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, d: dict, now: Optional[float] = None) -> "JobRecord":
+        """Parse the legacy display-string job dict (stored catalog, seed data)."""
+        sal_min, sal_max = parse_range(d.get("salary", ""))
+        exp_min, exp_max = parse_range(d.get("experience", ""))
+        return cls(d["id"], d["title"], d["company"], d["location"], d["portal"], d.get("skills", []),
+                   sal_min, sal_max, exp_min, exp_max, parse_posted(d.get("posted", ""), now),
+                   d.get("match", 0), d.get("url") or d.get("apply_url", ""), d.get("description", ""))
+
+    # ── Display values ──
+    @property
+    def skills(self) -> List[str]:
+        names = SKILLS.names
+        return [names[i] for i in self.skill_ids]
+
+    @property
+    def salary(self) -> str:
+        return f"₹{_fmt(self.salary_min)}-{_fmt(self.salary_max)} LPA"
+
+    @property
+    def experience(self) -> str:
+        if math.isnan(self.exp_min):
+            return ""
+        return f"{_fmt(self.exp_min)}-{_fmt(self.exp_max)} yrs"
+
+    @property
+    def posted(self) -> str:
+        return render_posted(self.posted_at)
+
+    @property
+    def apply_url(self) -> str:
+        return self.url
+
+    def to_dict(self, fields: Optional[Sequence[str]] = None) -> dict:
+        """Serialize to the API job shape, rendering only the requested fields."""
+        return {f: getattr(self, f) for f in (fields or JOB_FIELDS) if f in JOB_FIELDS}
+
+
+def to_records(jobs: Iterable[dict]) -> List[JobRecord]:
+    now = time.time()
+    return [j if isinstance(j, JobRecord) else JobRecord.from_dict(j, now) for j in jobs]
@@ -0,0 +1,52 @@
+"""Fast JSON responses and catalog ETags.
+
+Handlers that build their payload from trusted records (rendered JobRecords,
+rows read back from storage) return `FastJSONResponse` directly. That skips
+FastAPI's `jsonable_encoder` walk over every nested dict and encodes with
+orjson when it is installed, or compact stdlib json otherwise. It is also
+the app's default response class, so plain dict returns get the faster
+encoder too.
+
+`etag_response` adds a weak ETag computed from the encoded body. A matching
+If-None-Match gets an empty 304, so an unchanged job list is not resent.
+"""
+import hashlib
+import json
+from typing import Any, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+# Optional: orjson serializes several times faster than the stdlib encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=_OPTIONS)
+else:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def etag_response(request: Request, content: Any, headers: Optional[dict] = None) -> Response:
+    """FastJSONResponse with a weak ETag, or 304 if the client already has this body."""
+    body = dumps(content)
+    etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    # no-cache: clients may store the list but must revalidate (cheap with the ETag)
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": "no-cache"}
+    inm = request.headers.get("if-none-match", "")
+    if etag in (t.strip() for t in inm.split(",")) or inm.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,279 @@
+"""Resume text extraction and skill matching.
+
+Uploads are read in bounded chunks by the endpoint; extraction (PDF, DOCX,
+plain text) and skill matching run in a process pool so a large resume never
+blocks the event loop. Skills are found with a single Aho-Corasick pass over
+the lowercased text against the whole vocabulary (the resume skill pool plus
+every skill in the job catalog).
+"""
+import asyncio
+import html
+import importlib.util
+import io
+import re
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Optional: pypdf gives much better PDF text than the built-in fallback (imported on first PDF)
+PYPDF_AVAILABLE = importlib.util.find_spec("pypdf") is not None
+
+SKILLS_POOL = ["React","JavaScript","Python","Node.js","TypeScript","AWS","Docker",
+               "MongoDB","PostgreSQL","Java","Spring Boot","CSS","HTML","Git","MySQL",
+               "Kubernetes","Redis","FastAPI","Django","TensorFlow","Flutter","Kotlin"]
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over a skill vocabulary (case-insensitive).
+
+    Matches must sit on word boundaries, so "Java" does not fire inside
+    "JavaScript" and "Go" does not fire inside "Google". One-letter terms
+    (e.g. "C") are skipped; they match far too much prose to be useful.
+    """
+
+    def __init__(self, terms: Sequence[str]):
+        self.terms: List[str] = []
+        self._lens: List[int] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        seen = set()
+        for term in terms:
+            key = term.lower()
+            if len(key) < 2 or key in seen:
+                continue
+            seen.add(key)
+            self._add(key, len(self.terms))
+            self.terms.append(term)
+            self._lens.append(len(key))
+        self._build()
+
+    def _add(self, key: str, idx: int):
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({}); self._fail.append(0); self._out.append([])
+            node = nxt
+        self._out[node].append(idx)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> List[str]:
+        """Vocabulary terms found in `text`, in order of first occurrence."""
+        lowered = text.lower()
+        found: Dict[int, int] = {}
+        node = 0
+        for i, ch in enumerate(lowered):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for idx in self._out[node]:
+                if idx in found:
+                    continue
+                start, end = i - self._lens[idx] + 1, i + 1
+                if _boundary(lowered, start - 1, start) and _boundary(lowered, end, end - 1):
+                    found[idx] = start
+        return [self.terms[idx] for idx in sorted(found, key=found.get)]
+
+
+def _boundary(text: str, outside: int, inside: int) -> bool:
+    # Only alphanumeric term edges need a non-alphanumeric neighbour ("C++", ".NET")
+    if outside < 0 or outside >= len(text) or not text[inside].isalnum():
+        return True
+    return not text[outside].isalnum()
+
+
+# ── Text extraction ──
+# Uploads are capped compressed; these cap what they may expand to (zip / zlib bombs)
+MAX_DECOMPRESSED_BYTES = 8 * 1024 * 1024
+# Only this much extracted text is scanned for fields and skills
+MAX_TEXT_CHARS = 200_000
+
+
+class ResumeTooLarge(ValueError):
+    """The document expands past MAX_DECOMPRESSED_BYTES."""
+
+_PDF_STREAM = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.S)
+_PDF_TEXT_OP = re.compile(rb"\((?:\\.|[^\\)])*\)\s*Tj|\[(?:[^\]]*)\]\s*TJ|T\*|Td|TD|ET")
+_PDF_STRING = re.compile(rb"\(((?:\\.|[^\\)])*)\)")
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"(": b"(", b")": b")", b"\\": b"\\"}
+
+
+def _pdf_unescape(raw: bytes) -> bytes:
+    return re.sub(rb"\\(.)", lambda m: _PDF_ESCAPES.get(m.group(1), m.group(1)), raw)
+
+
+def _pdf_text_fallback(data: bytes) -> str:
+    """Pull text-showing operators out of (Flate-compressed) content streams."""
+    parts: List[bytes] = []
+    budget = MAX_DECOMPRESSED_BYTES  # shared by all streams in the file
+    for m in _PDF_STREAM.finditer(data):
+        stream = m.group(1)
+        try:
+            d = zlib.decompressobj()
+            out = d.decompress(stream, budget + 1)  # max_length 0 would mean unlimited
+        except zlib.error:
+            out = None  # not Flate: scan the raw stream
+        if out is not None:
+            budget -= len(out)
+            if d.unconsumed_tail or budget < 0:
+                raise ResumeTooLarge("PDF content expands past the size limit")
+            stream = out
+        for op in _PDF_TEXT_OP.finditer(stream):
+            token = op.group(0)
+            if token.endswith(b"Tj") or token.endswith(b"TJ"):
+                parts.extend(_pdf_unescape(s) for s in _PDF_STRING.findall(token))
+            else:
+                parts.append(b"\n" if token in (b"T*", b"ET") else b" ")
+    return b"".join(parts).decode("latin-1")
+
+
+def _pdf_text(data: bytes) -> str:
+    if PYPDF_AVAILABLE:
+        import pypdf
+        try:
+            reader = pypdf.PdfReader(io.BytesIO(data))
+            return "\n".join(page.extract_text() or "" for page in reader.pages)
+        except Exception:
+            pass
+    return _pdf_text_fallback(data)
+
+
+def _docx_text(data: bytes) -> str:
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        info = z.getinfo("word/document.xml")
+        if info.file_size > MAX_DECOMPRESSED_BYTES:
+            raise ResumeTooLarge("DOCX content expands past the size limit")
+        with z.open(info) as f:  # don't trust the header alone: read at most the limit
+            raw = f.read(MAX_DECOMPRESSED_BYTES + 1)
+        if len(raw) > MAX_DECOMPRESSED_BYTES:
+            raise ResumeTooLarge("DOCX content expands past the size limit")
+        xml = raw.decode("utf-8", errors="ignore")
+    xml = re.sub(r"</w:p>|<w:br/>", "\n", xml).replace("<w:tab/>", "\t")
+    return html.unescape(re.sub(r"<[^>]+>", "", xml))
+
+
+def extract_text(filename: str, data: bytes) -> str:
+    name = (filename or "").lower()
+    if name.endswith(".pdf") or data[:5] == b"%PDF-":
+        return _pdf_text(data)
+    if name.endswith(".docx") or data[:2] == b"PK":
+        try:
+            return _docx_text(data)
+        except (zipfile.BadZipFile, KeyError):
+            pass
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+# ── Field heuristics ──
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE = re.compile(r"(?:\+91[\s-]?)?[6-9]\d{4}[\s-]?\d{5}\b")
+_EXPERIENCE = re.compile(r"(\d{1,2}(?:\.\d)?)\+?\s*(?:years?|yrs?)", re.I)
+_EDUCATION = re.compile(r"\b(?:B\.?\s?Tech|M\.?\s?Tech|B\.?E\.?|B\.?Sc|M\.?Sc|BCA|MCA|MBA|Ph\.?D)\b[^\n]{0,60}", re.I)
+
+# Worker-process state: the vocabulary the pool was started with, and its matchers once built
+_VOCAB: Optional[Tuple[str, Sequence[str], Sequence[str]]] = None
+_MATCHERS: Optional[Tuple[SkillMatcher, SkillMatcher]] = None
+
+
+def _install_vocab(version: str, skills: Sequence[str], titles: Sequence[str]):
+    """Pool initializer: each worker receives the vocabulary once, when it starts."""
+    global _VOCAB, _MATCHERS
+    _VOCAB, _MATCHERS = (version, skills, titles), None
+
+
+def _matchers(version: str) -> Tuple[SkillMatcher, SkillMatcher]:
+    global _MATCHERS
+    if _VOCAB is None or _VOCAB[0] != version:
+        raise RuntimeError(f"worker has vocabulary {_VOCAB and _VOCAB[0]!r}, not {version!r}")
+    if _MATCHERS is None:
+        _MATCHERS = (SkillMatcher(_VOCAB[1]), SkillMatcher(_VOCAB[2]))
+    return _MATCHERS
+
+
+def parse_resume_bytes(filename: str, data: bytes, version: str) -> dict:
+    """Extract profile fields from a resume. Runs inside the process pool, whose
+    workers hold the skill/title vocabulary for catalog `version`.
+
+    Raises ResumeTooLarge for documents that decompress past the limit.
+    """
+    text = extract_text(filename, data)[:MAX_TEXT_CHARS]
+    skill_matcher, title_matcher = _matchers(version)
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    name = next((l for l in lines[:5] if re.fullmatch(r"[A-Za-z][A-Za-z .'-]{2,40}", l)), None)
+    email = _EMAIL.search(text)
+    phone = _PHONE.search(text)
+    exp = _EXPERIENCE.search(text)
+    edu = _EDUCATION.search(text)
+    return {
+        "name": name or "Your Name",
+        "email": email.group(0) if email else "your@email.com",
+        "phone": phone.group(0) if phone else "+91 9876543210",
+        "experience": f"{exp.group(1)} years" if exp else "3 years",
+        "skills": skill_matcher.find(text),
+        "job_titles": title_matcher.find(text)[:5] or ["Software Engineer","Full Stack Developer"],
+        "education": edu.group(0).strip() if edu else "B.Tech Computer Science",
+        "chars": len(text),
+    }
+
+
+# ── Process pool ──
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_version: Optional[str] = None
+
+def get_pool(workers: int, vocab: Tuple[str, Sequence[str], Sequence[str]]) -> ProcessPoolExecutor:
+    """The pool whose workers were started with `vocab` (version, skills, titles).
+
+    A new catalog version replaces the pool; work already queued on the old
+    one still finishes there.
+    """
+    global _pool, _pool_version
+    if _pool is not None and _pool_version != vocab[0]:
+        _pool.shutdown(wait=False)
+        _pool = None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=_install_vocab, initargs=vocab)
+        _pool_version = vocab[0]
+    return _pool
+
+def _discard(pool: ProcessPoolExecutor):
+    global _pool
+    pool.shutdown(wait=False, cancel_futures=True)
+    if _pool is pool:  # a concurrent caller may already have built the replacement
+        _pool = None
+
+async def run_in_pool(workers: int, vocab: Tuple[str, Sequence[str], Sequence[str]], fn, *args):
+    """Run `fn` in the pool for `vocab`. If a worker died (e.g. killed for memory)
+    the pool is broken for good, so it is replaced and the call retried once."""
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = get_pool(workers, vocab)
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            _discard(pool)
+            if attempt:
+                raise
+
+def shutdown_pool():
+    if _pool is not None:
+        _discard(_pool)
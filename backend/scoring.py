@@ -0,0 +1,170 @@
+"""Vectorized profile-to-job match scoring.
+
+`MatchEngine` is built once per catalog. It keeps the job skills and title
+tokens as sparse incidence matrices (CSR-style entry arrays) plus numeric
+experience / salary ranges and location codes, so one profile is scored
+against every job with a handful of NumPy operations. Scores (0-100) are
+cached per user until the profile content or the catalog changes.
+"""
+import hashlib
+import json
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from job_index import ANYWHERE_LOCATIONS
+from records import JobRecord, parse_range
+
+WEIGHTS = {"skills": 0.45, "title": 0.20, "experience": 0.15, "salary": 0.10, "location": 0.10}
+NEUTRAL = 0.5  # component score when the job does not say (e.g. no experience range)
+# Skill credit for jobs that list no skills (every live provider row). Unlike the
+# other components this is not NEUTRAL: half credit would beat a real partial match.
+NO_SKILLS = 0.0
+_WORD = re.compile(r"[a-z0-9+#.]+")
+
+
+def _lpa(value: float) -> float:
+    # Profiles may send salaries in rupees or in lakhs per annum
+    return value / 100_000 if value > 1000 else value
+
+
+def _tokens(text: str) -> List[str]:
+    return [w for w in _WORD.findall(text.lower()) if len(w) > 1]
+
+
+class _Incidence:
+    """Sparse job x term incidence: entry k says job `rows[k]` has term `cols[k]`."""
+
+    def __init__(self, term_lists: Sequence[Sequence[str]]):
+        self.vocab: Dict[str, int] = {}
+        rows, cols = [], []
+        for r, terms in enumerate(term_lists):
+            for t in dict.fromkeys(terms):
+                rows.append(r)
+                cols.append(self.vocab.setdefault(t, len(self.vocab)))
+        self.n = len(term_lists)
+        self.rows = np.asarray(rows, dtype=np.int32)
+        self.cols = np.asarray(cols, dtype=np.int32)
+        self.counts = np.bincount(self.rows, minlength=self.n).astype(np.float32)
+
+    def overlap(self, terms: Sequence[str]) -> np.ndarray:
+        """Per-job count of `terms` present, via one weighted bincount."""
+        vec = np.zeros(len(self.vocab) + 1, dtype=np.float32)
+        for t in terms:
+            idx = self.vocab.get(t)
+            if idx is not None:
+                vec[idx] = 1.0
+        return np.bincount(self.rows, weights=vec[self.cols], minlength=self.n).astype(np.float32)
+
+    def coverage(self, terms: Sequence[str], missing: float = NEUTRAL) -> np.ndarray:
+        """Fraction of each job's terms found in `terms`; `missing` for jobs with none."""
+        cov = np.full(self.n, missing, dtype=np.float32)
+        has = self.counts > 0
+        cov[has] = self.overlap(terms)[has] / self.counts[has]
+        return cov
+
+
+class MatchEngine:
+    def __init__(self, jobs: Sequence[JobRecord], cache_size: int = 256):
+        n = len(jobs)
+        self.n = n
+        self.skills = _Incidence([[s.lower() for s in j.skills] for j in jobs])
+        self.titles = _Incidence([_tokens(j.title) for j in jobs])
+
+        self.exp_min = np.fromiter((j.exp_min for j in jobs), np.float32, n)
+        self.exp_max = np.fromiter((j.exp_max for j in jobs), np.float32, n)
+        self.sal_max = np.fromiter((j.salary_max for j in jobs), np.float32, n)
+
+        codes: Dict[str, int] = {}
+        self.loc_code = np.array([codes.setdefault(j.location, len(codes)) for j in jobs], dtype=np.int32)
+        self.locations: List[str] = list(codes)
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[str, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()  # scores_for runs on request threads
+
+    # Snapshots carry the arrays, not the lock or anyone's cached scores
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        state["_cache"] = OrderedDict()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    # ── components ──
+    def _experience(self, years: float) -> np.ndarray:
+        gap = np.maximum(self.exp_min - years, 0) + np.maximum(years - self.exp_max, 0)
+        out = 1.0 - np.minimum(gap / 3.0, 1.0)
+        return np.where(np.isnan(self.exp_min), NEUTRAL, out).astype(np.float32)
+
+    def _salary(self, expected_min: float) -> np.ndarray:
+        if expected_min <= 0:
+            return np.ones(self.n, dtype=np.float32)
+        out = np.clip(self.sal_max / expected_min, 0.0, 1.0)
+        return np.where(np.isnan(self.sal_max), NEUTRAL, out).astype(np.float32)
+
+    def _location(self, prefs: Sequence[str]) -> np.ndarray:
+        prefs = [p.lower() for p in prefs if p]
+        if not prefs:
+            return np.ones(self.n, dtype=np.float32)
+        ok = np.array([loc in ANYWHERE_LOCATIONS or any(p in loc.lower() or loc.lower() in p for p in prefs)
+                       for loc in self.locations] or [False], dtype=np.float32)
+        return ok[self.loc_code]
+
+    def score(self, profile: dict) -> np.ndarray:
+        """0-100 match for every job in catalog order (uint8)."""
+        skills = [s.lower() for s in profile.get("skills", [])]
+        title_tokens = [t for title in profile.get("job_titles", []) for t in _tokens(title)]
+        years = parse_range(str(profile.get("experience", "")))[0]
+        total = WEIGHTS["skills"] * (self.skills.coverage(skills, NO_SKILLS) if skills else np.zeros(self.n, np.float32))
+        total += WEIGHTS["title"] * (self.titles.coverage(title_tokens) if title_tokens else NEUTRAL)
+        total += WEIGHTS["experience"] * (NEUTRAL if math.isnan(years) else self._experience(years))
+        total += WEIGHTS["salary"] * self._salary(_lpa(float(profile.get("salary_min") or 0)))
+        total += WEIGHTS["location"] * self._location([*profile.get("preferred_locations", []),
+                                                       profile.get("location", "")])
+        return np.rint(np.clip(total, 0, 1) * 100).astype(np.uint8)
+
+    def scores_for(self, user_id: str, profile: dict) -> np.ndarray:
+        """Cached `score` keyed by user; recomputed when the profile changes."""
+        version = hashlib.blake2b(json.dumps(profile, sort_keys=True).encode(), digest_size=16).hexdigest()
+        with self._lock:
+            hit = self._cache.get(user_id)
+            if hit is not None and hit[0] == version:
+                self._cache.move_to_end(user_id)
+                return hit[1]
+        scores = self.score(profile)
+        with self._lock:
+            self._cache[user_id] = (version, scores)
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return scores
+
+
+class ScoreKeys:
+    """Lazy (-score, position) sort keys over an ordered result, for keyset paging."""
+
+    def __init__(self, positions: np.ndarray, scores: np.ndarray):
+        self.positions, self.scores = positions, scores
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, i: int) -> Tuple[int, int]:
+        return -int(self.scores[i]), int(self.positions[i])
+
+
+def rank(positions: np.ndarray, scores: np.ndarray, min_match: int = 0) -> ScoreKeys:
+    """Filter by `min_match` and order by score desc, then position asc."""
+    if min_match:
+        keep = scores >= min_match
+        positions, scores = positions[keep], scores[keep]
+    order = np.lexsort((positions, -scores.astype(np.int16)))
+    return ScoreKeys(positions[order], scores[order])
@@ -0,0 +1,83 @@
+"""Application status pipeline (simulated recruiter activity).
+
+Statuses only move forward through explicit transitions. Each transition is
+stored as a timestamped event, and the per-user counters behind
+/api/stats are adjusted in the same transaction. A background scheduler
+advances applications whose `next_status_at` has passed, so reads never
+mutate or rescan anything.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Callable, Optional, Tuple
+
+log = logging.getLogger("applyai.status")
+
+APPLIED = "Applied"
+VIEWED = "Viewed by Recruiter"
+SHORTLISTED = "Shortlisted"
+INTERVIEW = "Interview Scheduled"
+
+# status -> (next status, probability); otherwise the application stays put for good
+TRANSITIONS = {
+    APPLIED:     (VIEWED, 0.45),
+    VIEWED:      (SHORTLISTED, 0.5),
+    SHORTLISTED: (INTERVIEW, 0.6),
+}
+
+FIRST_CHECK_DELAY_S = 30.0   # same 30s grace period the old read-time simulation used
+STEP_DELAY_S        = 60.0
+
+
+def counters(status: str) -> Tuple[int, int]:
+    """(viewed, interviews) contribution of one application in `status`."""
+    return int("Viewed" in status), int("Interview" in status or "Shortlisted" in status)
+
+
+def next_step(status: str, now: float, rng: random.Random = random) -> Tuple[Optional[str], Optional[float]]:
+    """Decide a due application's fate: (new status or None, next check time or None)."""
+    nxt = TRANSITIONS.get(status)
+    if nxt is None or rng.random() >= nxt[1]:
+        return None, None
+    return nxt[0], (now + STEP_DELAY_S if nxt[0] in TRANSITIONS else None)
+
+
+class StatusScheduler:
+    """Periodically advances due applications through `repo.advance_due`."""
+
+    def __init__(self, repo, interval: float = 5.0, batch: int = 500,
+                 step: Callable[[str, float], Tuple[Optional[str], Optional[float]]] = next_step):
+        self.repo, self.interval, self.batch, self.step = repo, interval, batch, step
+        self._task: Optional[asyncio.Task] = None
+
+    def tick(self, now: Optional[float] = None) -> int:
+        """Advance everything due at `now`; returns the number of transitions."""
+        now = time.time() if now is None else now
+        moved = 0
+        while True:
+            processed, changed = self.repo.advance_due(now, self.batch, self.step)
+            moved += changed
+            if processed < self.batch:
+                return moved
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.tick)
+            except Exception:
+                log.exception("status scheduler tick failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
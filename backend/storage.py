@@ -0,0 +1,419 @@
+"""Persistent storage for users, profiles, jobs and applications.
+
+Endpoints talk to a `Repository`; the default implementation is SQLite in WAL
+mode, so several uvicorn workers can share one database file and data
+survives restarts. Connections come from a small pool, every statement is a
+module-level constant (sqlite3 keeps compiled statements in a per-connection
+cache) and application inserts are written in one transaction per batch.
+"""
+import datetime
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from records import pin_posted
+from status_pipeline import counters
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "applyai.db")
+
+APPLICATION_COLUMNS = ("id", "job_id", "title", "company", "portal", "salary",
+                       "location", "status", "applied_at", "match", "url")
+
+
+class Repository(ABC):
+    """Storage interface used by the API handlers; backends must implement all of it."""
+
+    # users
+    @abstractmethod
+    def create_user(self, user: dict) -> bool:
+        """Insert a user; False if the email is already registered."""
+
+    @abstractmethod
+    def get_user_by_email(self, email: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def set_password(self, user_id: str, password: str):
+        """Replace the stored password hash (used to upgrade old rows on login)."""
+
+    @abstractmethod
+    def auth_secret(self) -> str:
+        """Token signing key, generated once per database so all workers share it."""
+
+    # profiles
+    @abstractmethod
+    def save_profile(self, user_id: str, profile: dict):
+        ...
+
+    @abstractmethod
+    def get_profile(self, user_id: str) -> Optional[dict]:
+        ...
+
+    # jobs
+    @abstractmethod
+    def load_jobs(self) -> List[dict]:
+        ...
+
+    @abstractmethod
+    def replace_jobs(self, jobs: Sequence[dict]):
+        ...
+
+    @abstractmethod
+    def catalog_version(self) -> str:
+        """Opaque token that changes whenever the stored catalog does."""
+
+    # applications
+    @abstractmethod
+    def applied_job_ids(self, user_id: str, job_ids: Iterable[str]) -> set:
+        ...
+
+    @abstractmethod
+    def add_applications(self, user_id: str, records: Sequence[dict],
+                         next_status_at: Optional[float] = None) -> List[dict]:
+        """Insert records in one batch, skipping jobs the user already applied to.
+
+        Also records each record's initial status event and bumps the user's
+        counters. Returns the records that were actually inserted.
+        """
+
+    @abstractmethod
+    def list_applications(self, user_id: str, after: int = 0, limit: int = 50,
+                          newest_first: bool = False) -> List[Tuple[int, dict]]:
+        """(seq, record) pairs in insertion order, starting after `after`.
+
+        With `newest_first`, in reverse order, starting before `after` (0: the newest).
+        """
+
+    @abstractmethod
+    def count_applications(self, user_id: str) -> int:
+        ...
+
+    @abstractmethod
+    def application_events(self, user_id: str, application_id: str) -> List[dict]:
+        ...
+
+    @abstractmethod
+    def advance_due(self, now: float, limit: int,
+                    step: Callable[[str, float], Tuple[Optional[str], Optional[float]]]) -> Tuple[int, int]:
+        """Apply `step` to up to `limit` applications due at `now`.
+
+        Returns (applications processed, status transitions made).
+        """
+
+    @abstractmethod
+    def application_stats(self, user_id: str) -> Dict[str, int]:
+        ...
+
+
+# ── SQL ──
+SCHEMA = [
+    # version 1
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL UNIQUE,
+        password TEXT NOT NULL, created_at TEXT NOT NULL);
+    CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+    CREATE TABLE IF NOT EXISTS profiles (
+        user_id TEXT PRIMARY KEY, data TEXT NOT NULL);
+    CREATE TABLE IF NOT EXISTS jobs (
+        pos INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, data TEXT NOT NULL);
+    CREATE TABLE IF NOT EXISTS applications (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL UNIQUE,
+        user_id TEXT NOT NULL, job_id TEXT NOT NULL,
+        title TEXT, company TEXT, portal TEXT, salary TEXT, location TEXT,
+        status TEXT NOT NULL, applied_at TEXT NOT NULL, match INTEGER, url TEXT,
+        UNIQUE (user_id, job_id));
+    CREATE INDEX IF NOT EXISTS idx_applications_user ON applications(user_id, seq);
+    CREATE INDEX IF NOT EXISTS idx_applications_job ON applications(job_id);
+    CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(user_id, status);
+    """,
+    # version 2: status events, scheduled transitions, incremental per-user counters
+    """
+    ALTER TABLE applications ADD COLUMN next_status_at REAL;
+    CREATE INDEX IF NOT EXISTS idx_applications_due ON applications(next_status_at)
+        WHERE next_status_at IS NOT NULL;
+    CREATE TABLE IF NOT EXISTS application_events (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT, application_id TEXT NOT NULL,
+        user_id TEXT NOT NULL, status TEXT NOT NULL, at TEXT NOT NULL);
+    CREATE INDEX IF NOT EXISTS idx_events_application ON application_events(application_id, seq);
+    CREATE TABLE IF NOT EXISTS user_stats (
+        user_id TEXT PRIMARY KEY, total_applied INTEGER NOT NULL DEFAULT 0,
+        viewed INTEGER NOT NULL DEFAULT 0, interviews INTEGER NOT NULL DEFAULT 0);
+    INSERT INTO user_stats (user_id, total_applied, viewed, interviews)
+        SELECT user_id, COUNT(*), SUM(instr(status, 'Viewed') > 0),
+               SUM(instr(status, 'Interview') > 0 OR instr(status, 'Shortlisted') > 0)
+        FROM applications GROUP BY user_id;
+    INSERT INTO application_events (application_id, user_id, status, at)
+        SELECT id, user_id, status, applied_at FROM applications ORDER BY seq;
+    UPDATE applications SET next_status_at = CAST(strftime('%s', 'now') AS REAL);
+    """,
+    # version 3: catalog version token (keys prebuilt catalog snapshots)
+    """
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+    INSERT OR IGNORE INTO meta (key, value) VALUES ('catalog_version', lower(hex(randomblob(8))));
+    """,
+    # version 4: token signing key
+    """
+    INSERT OR IGNORE INTO meta (key, value) VALUES ('auth_secret', lower(hex(randomblob(32))));
+    """,
+    # version 5: absolute posted times for stored jobs (see SQLiteRepository._pin_job_times)
+    lambda conn: SQLiteRepository._pin_job_times(conn),
+]
+
+SQL_INSERT_USER = "INSERT OR IGNORE INTO users (id, name, email, password, created_at) VALUES (?, ?, ?, ?, ?)"
+SQL_USER_BY_EMAIL = "SELECT id, name, email, password, created_at FROM users WHERE email = ?"
+SQL_SET_PASSWORD = "UPDATE users SET password = ? WHERE id = ?"
+SQL_AUTH_SECRET = "SELECT value FROM meta WHERE key = 'auth_secret'"
+SQL_UPSERT_PROFILE = "INSERT INTO profiles (user_id, data) VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET data = excluded.data"
+SQL_GET_PROFILE = "SELECT data FROM profiles WHERE user_id = ?"
+SQL_LOAD_JOBS = "SELECT data FROM jobs ORDER BY pos"
+SQL_INSERT_JOB = "INSERT INTO jobs (pos, id, data) VALUES (?, ?, ?)"
+SQL_BUMP_CATALOG_VERSION = "UPDATE meta SET value = lower(hex(randomblob(8))) WHERE key = 'catalog_version'"
+SQL_JOB_ROWS = "SELECT pos, data FROM jobs"
+SQL_UPDATE_JOB = "UPDATE jobs SET data = ? WHERE pos = ?"
+SQL_CATALOG_VERSION = "SELECT value FROM meta WHERE key = 'catalog_version'"
+SQL_INSERT_APPLICATION = (
+    f"INSERT OR IGNORE INTO applications (user_id, next_status_at, {', '.join(APPLICATION_COLUMNS)}) "
+    f"VALUES (?, ?{', ?' * len(APPLICATION_COLUMNS)})"
+)
+SQL_INSERT_EVENT = "INSERT INTO application_events (application_id, user_id, status, at) VALUES (?, ?, ?, ?)"
+SQL_LIST_EVENTS = (
+    "SELECT status, at FROM application_events WHERE application_id = ? AND user_id = ? ORDER BY seq"
+)
+SQL_BUMP_STATS = """
+    INSERT INTO user_stats (user_id, total_applied, viewed, interviews) VALUES (?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET total_applied = total_applied + excluded.total_applied,
+        viewed = viewed + excluded.viewed, interviews = interviews + excluded.interviews"""
+SQL_DUE = (
+    "SELECT id, user_id, status FROM applications "
+    "WHERE next_status_at IS NOT NULL AND next_status_at <= ? ORDER BY next_status_at LIMIT ?"
+)
+SQL_ADVANCE = "UPDATE applications SET status = ?, next_status_at = ? WHERE id = ?"
+SQL_LIST_APPLICATIONS = (
+    f"SELECT seq, {', '.join(APPLICATION_COLUMNS)} FROM applications "
+    "WHERE user_id = ? AND seq > ? ORDER BY seq LIMIT ?"
+)
+SQL_LIST_APPLICATIONS_DESC = (
+    f"SELECT seq, {', '.join(APPLICATION_COLUMNS)} FROM applications "
+    "WHERE user_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?"
+)
+SQL_APPLICATION_STATS = "SELECT total_applied, viewed, interviews FROM user_stats WHERE user_id = ?"
+
+
+class ConnectionPool:
+    """Fixed-size pool of sqlite3 connections shared by handler threads."""
+
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self._uri = path.startswith("file:")
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._all: List[sqlite3.Connection] = []
+        for _ in range(size):
+            conn = self._connect()
+            self._all.append(conn)
+            self._pool.put(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, uri=self._uri, timeout=30.0, isolation_level=None,
+                               check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        """Run a block in one transaction; IMMEDIATE takes the write lock up front."""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        for conn in self._all:
+            conn.close()
+
+
+class SQLiteRepository(Repository):
+    def __init__(self, path: str = DEFAULT_DB_PATH, pool_size: int = 4):
+        if path == ":memory:":
+            # One private shared-cache database per repository; a single
+            # connection avoids shared-cache table locks between threads.
+            path, pool_size = f"file:applyai-{id(self)}?mode=memory&cache=shared", 1
+        self.pool = ConnectionPool(path, pool_size)
+        self._migrate_lock = threading.Lock()
+
+    def close(self):
+        self.pool.close()
+
+    # ── migrations ──
+    def migrate(self, seed_jobs: Optional[Callable[[], List[dict]]] = None):
+        """Bring the schema up to date; seed the job catalog if it is empty."""
+        with self._migrate_lock, self.pool.transaction(immediate=True) as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for v, script in enumerate(SCHEMA[version:], start=version + 1):
+                if callable(script):
+                    script(conn)
+                else:
+                    for stmt in script.split(";"):
+                        if stmt.strip():
+                            conn.execute(stmt)
+                conn.execute(f"PRAGMA user_version = {v}")
+            if seed_jobs and not conn.execute("SELECT 1 FROM jobs LIMIT 1").fetchone():
+                self._insert_jobs(conn, seed_jobs())
+
+    # ── users ──
+    def create_user(self, user: dict) -> bool:
+        with self.pool.connection() as conn:
+            cur = conn.execute(SQL_INSERT_USER, (user["id"], user["name"], user["email"],
+                                                 user["password"], user["created_at"]))
+            return cur.rowcount == 1
+
+    def get_user_by_email(self, email: str) -> Optional[dict]:
+        with self.pool.connection() as conn:
+            row = conn.execute(SQL_USER_BY_EMAIL, (email,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("id", "name", "email", "password", "created_at"), row))
+
+    def set_password(self, user_id: str, password: str):
+        with self.pool.connection() as conn:
+            conn.execute(SQL_SET_PASSWORD, (password, user_id))
+
+    def auth_secret(self) -> str:
+        with self.pool.connection() as conn:
+            return conn.execute(SQL_AUTH_SECRET).fetchone()[0]
+
+    # ── profiles ──
+    def save_profile(self, user_id: str, profile: dict):
+        with self.pool.connection() as conn:
+            conn.execute(SQL_UPSERT_PROFILE, (user_id, json.dumps(profile)))
+
+    def get_profile(self, user_id: str) -> Optional[dict]:
+        with self.pool.connection() as conn:
+            row = conn.execute(SQL_GET_PROFILE, (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # ── jobs ──
+    def load_jobs(self) -> List[dict]:
+        with self.pool.connection() as conn:
+            return [json.loads(data) for (data,) in conn.execute(SQL_LOAD_JOBS)]
+
+    @staticmethod
+    def _insert_jobs(conn: sqlite3.Connection, jobs: Sequence[dict]):
+        now = time.time()
+        conn.executemany(SQL_INSERT_JOB, ((pos, j["id"], json.dumps(pin_posted(j, now)))
+                                          for pos, j in enumerate(jobs)))
+        conn.execute(SQL_BUMP_CATALOG_VERSION)
+
+    @staticmethod
+    def _pin_job_times(conn: sqlite3.Connection):
+        """Rewrite 'posted' labels stored before version 5 as absolute times, read as of now."""
+        now = time.time()
+        rows = conn.execute(SQL_JOB_ROWS).fetchall()
+        conn.executemany(SQL_UPDATE_JOB, ((json.dumps(pin_posted(json.loads(data), now)), pos)
+                                          for pos, data in rows))
+        conn.execute(SQL_BUMP_CATALOG_VERSION)
+
+    def replace_jobs(self, jobs: Sequence[dict]):
+        with self.pool.transaction(immediate=True) as conn:
+            conn.execute("DELETE FROM jobs")
+            self._insert_jobs(conn, jobs)
+
+    def catalog_version(self) -> str:
+        with self.pool.connection() as conn:
+            return conn.execute(SQL_CATALOG_VERSION).fetchone()[0]
+
+    # ── applications ──
+    def applied_job_ids(self, user_id: str, job_ids: Iterable[str]) -> set:
+        with self.pool.connection() as conn:
+            return self._applied(conn, user_id, list(job_ids))
+
+    @staticmethod
+    def _applied(conn: sqlite3.Connection, user_id: str, job_ids: List[str]) -> set:
+        found = set()
+        for i in range(0, len(job_ids), 500):  # stay under SQLITE_MAX_VARIABLE_NUMBER
+            chunk = job_ids[i:i + 500]
+            sql = f"SELECT job_id FROM applications WHERE user_id = ? AND job_id IN ({', '.join('?' * len(chunk))})"
+            found.update(r[0] for r in conn.execute(sql, (user_id, *chunk)))
+        return found
+
+    def add_applications(self, user_id: str, records: Sequence[dict],
+                         next_status_at: Optional[float] = None) -> List[dict]:
+        if not records:
+            return []
+        with self.pool.transaction(immediate=True) as conn:
+            existing = self._applied(conn, user_id, [r["job_id"] for r in records])
+            fresh = [r for r in records if r["job_id"] not in existing]
+            if fresh:
+                conn.executemany(SQL_INSERT_APPLICATION, ((user_id, next_status_at, *(r[c] for c in APPLICATION_COLUMNS))
+                                                          for r in fresh))
+                conn.executemany(SQL_INSERT_EVENT, ((r["id"], user_id, r["status"], r["applied_at"]) for r in fresh))
+                viewed, interviews = map(sum, zip(*(counters(r["status"]) for r in fresh)))
+                conn.execute(SQL_BUMP_STATS, (user_id, len(fresh), viewed, interviews))
+        return fresh
+
+    def list_applications(self, user_id: str, after: int = 0, limit: int = 50,
+                          newest_first: bool = False) -> List[Tuple[int, dict]]:
+        if newest_first:
+            sql, after = SQL_LIST_APPLICATIONS_DESC, after or 2 ** 63 - 1
+        else:
+            sql = SQL_LIST_APPLICATIONS
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, (user_id, after, limit)).fetchall()
+        return [(row[0], dict(zip(APPLICATION_COLUMNS, row[1:]))) for row in rows]
+
+    def count_applications(self, user_id: str) -> int:
+        return self.application_stats(user_id)["total_applied"]
+
+    def application_events(self, user_id: str, application_id: str) -> List[dict]:
+        with self.pool.connection() as conn:
+            rows = conn.execute(SQL_LIST_EVENTS, (application_id, user_id)).fetchall()
+        return [{"status": status, "at": at} for status, at in rows]
+
+    def advance_due(self, now: float, limit: int,
+                    step: Callable[[str, float], Tuple[Optional[str], Optional[float]]]) -> Tuple[int, int]:
+        at = str(datetime.datetime.fromtimestamp(now))
+        with self.pool.transaction(immediate=True) as conn:
+            due = conn.execute(SQL_DUE, (now, limit)).fetchall()
+            updates, events = [], []
+            deltas: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+            for app_id, user_id, status in due:
+                new, next_at = step(status, now)
+                updates.append((new or status, next_at, app_id))
+                if new is None or new == status:
+                    continue
+                events.append((app_id, user_id, new, at))
+                (ov, oi), (nv, ni) = counters(status), counters(new)
+                d = deltas[user_id]
+                d[0] += nv - ov
+                d[1] += ni - oi
+            conn.executemany(SQL_ADVANCE, updates)
+            conn.executemany(SQL_INSERT_EVENT, events)
+            conn.executemany(SQL_BUMP_STATS, ((uid, 0, v, i) for uid, (v, i) in deltas.items()))
+        return len(due), len(events)
+
+    def application_stats(self, user_id: str) -> Dict[str, int]:
+        with self.pool.connection() as conn:
+            row = conn.execute(SQL_APPLICATION_STATS, (user_id,)).fetchone()
+        total, viewed, interviews = row or (0, 0, 0)
+        return {"total_applied": total, "viewed": viewed, "interviews": interviews}
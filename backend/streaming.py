@@ -0,0 +1,47 @@
+"""NDJSON / Server-Sent Events framing for streamed responses.
+
+A streaming endpoint produces (event, payload) frames, synchronously or
+asynchronously. `stream_response` encodes each one as it is produced: one
+JSON object per line for NDJSON, or an `event:` / `data:` block for SSE.
+Clients pick the format with `?format=sse|ndjson` or an `Accept:
+text/event-stream` header.
+"""
+from typing import AsyncIterable, Iterable, Optional, Tuple, Union
+
+from fastapi.responses import StreamingResponse
+
+from responses import dumps
+
+NDJSON = "application/x-ndjson"
+SSE = "text/event-stream"
+
+Frame = Tuple[str, dict]
+
+
+def wants_sse(fmt: Optional[str], accept: Optional[str]) -> bool:
+    if fmt:
+        if fmt not in ("sse", "ndjson"):
+            raise ValueError("format must be 'ndjson' or 'sse'")
+        return fmt == "sse"
+    return SSE in (accept or "")
+
+
+def encode(event: str, payload: dict, sse: bool) -> bytes:
+    if sse:
+        return b"event: " + event.encode() + b"\ndata: " + dumps(payload) + b"\n\n"
+    # NDJSON frames carry their type inline
+    return dumps({"event": event, **payload}) + b"\n"
+
+
+def stream_response(frames: Union[Iterable[Frame], AsyncIterable[Frame]], sse: bool) -> StreamingResponse:
+    if hasattr(frames, "__aiter__"):
+        async def body():
+            async for event, payload in frames:
+                yield encode(event, payload, sse)
+    else:
+        def body():
+            for event, payload in frames:
+                yield encode(event, payload, sse)
+    # no-transform / X-Accel-Buffering keep proxies from holding frames back
+    headers = {"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"}
+    return StreamingResponse(body(), media_type=SSE if sse else NDJSON, headers=headers)